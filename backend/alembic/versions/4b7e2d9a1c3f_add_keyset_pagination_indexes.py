@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset pagination of quotes
+
+Revision ID: 4b7e2d9a1c3f
+Revises: 163c391d1552
+Create Date: 2025-10-20 10:12:41.220318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d9a1c3f'
+down_revision: Union[str, Sequence[str], None] = '163c391d1552'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_quotes_created_at_id', 'quotes', ['created_at', 'id'], unique=False)
+    op.create_index('ix_quotes_category_created_at_id', 'quotes', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_quotes_author_created_at_id', 'quotes', ['author', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_quotes_author_created_at_id', table_name='quotes')
+    op.drop_index('ix_quotes_category_created_at_id', table_name='quotes')
+    op.drop_index('ix_quotes_created_at_id', table_name='quotes')
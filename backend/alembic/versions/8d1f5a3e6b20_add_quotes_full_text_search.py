@@ -0,0 +1,61 @@
+"""Add FTS5 full-text index over quote text
+
+Revision ID: 8d1f5a3e6b20
+Revises: 4b7e2d9a1c3f
+Create Date: 2025-10-21 14:03:19.584102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1f5a3e6b20'
+down_revision: Union[str, Sequence[str], None] = '4b7e2d9a1c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE quotes_fts USING fts5(
+            text, content='quotes', content_rowid='id', tokenize='porter unicode61'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER quotes_fts_ai AFTER INSERT ON quotes BEGIN
+            INSERT INTO quotes_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER quotes_fts_ad AFTER DELETE ON quotes BEGIN
+            INSERT INTO quotes_fts(quotes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER quotes_fts_au AFTER UPDATE OF text ON quotes BEGIN
+            INSERT INTO quotes_fts(quotes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO quotes_fts(rowid, text) VALUES (new.id, new.text);
+        END
+        """
+    )
+    # Backfill the index from the existing rows
+    op.execute("INSERT INTO quotes_fts(quotes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS quotes_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS quotes_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS quotes_fts_ai")
+    op.execute("DROP TABLE IF EXISTS quotes_fts")
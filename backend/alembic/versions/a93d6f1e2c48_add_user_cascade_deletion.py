@@ -0,0 +1,106 @@
+"""Add soft-deleted users and background cascade deletion jobs
+
+Revision ID: a93d6f1e2c48
+Revises: f41c8e2b7a96
+Create Date: 2025-11-03 10:18:44.502917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d6f1e2c48'
+down_revision: Union[str, Sequence[str], None] = 'f41c8e2b7a96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Users pending deletion no longer count towards the users total
+COUNTER_TRIGGERS = {
+    'counters_users_ad': """
+        CREATE TRIGGER counters_users_ad AFTER DELETE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES
+                ('users', '', -(old.deleted_at IS NULL)),
+                ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_users_au': """
+        CREATE TRIGGER counters_users_au AFTER UPDATE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES
+                ('users', '', (old.deleted_at IS NOT NULL) - (new.deleted_at IS NOT NULL)),
+                ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+}
+
+PREVIOUS_COUNTER_TRIGGERS = {
+    'counters_users_ad': """
+        CREATE TRIGGER counters_users_ad AFTER DELETE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES ('users', '', -1), ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_users_au': """
+        CREATE TRIGGER counters_users_au AFTER UPDATE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+}
+
+HIDDEN_AUTHOR_TRIGGERS = {
+    'quotes_hidden_author_bi': """
+        CREATE TRIGGER quotes_hidden_author_bi BEFORE INSERT ON quotes
+        WHEN (SELECT deleted_at FROM users WHERE id = new.author) IS NOT NULL BEGIN
+            SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: author is being deleted');
+        END
+    """,
+    'quotes_hidden_author_bu': """
+        CREATE TRIGGER quotes_hidden_author_bu BEFORE UPDATE OF author ON quotes
+        WHEN (SELECT deleted_at FROM users WHERE id = new.author) IS NOT NULL BEGIN
+            SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: author is being deleted');
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('user_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('quotes_total', sa.Integer(), nullable=False),
+    sa.Column('quotes_deleted', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_deletions_user_id'), 'user_deletions', ['user_id'], unique=False)
+
+    for name, statement in COUNTER_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(statement)
+    for statement in HIDDEN_AUTHOR_TRIGGERS.values():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in HIDDEN_AUTHOR_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    for name, statement in PREVIOUS_COUNTER_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute(statement)
+
+    op.drop_index(op.f('ix_user_deletions_user_id'), table_name='user_deletions')
+    op.drop_table('user_deletions')
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,58 @@
+"""Add trigger-written quote change log for the change feed
+
+Revision ID: b5e8c2d47f13
+Revises: a93d6f1e2c48
+Create Date: 2025-11-05 14:07:52.861340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e8c2d47f13'
+down_revision: Union[str, Sequence[str], None] = 'a93d6f1e2c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS = {
+    'quote_changes_ai': """
+        CREATE TRIGGER quote_changes_ai AFTER INSERT ON quotes BEGIN
+            INSERT INTO quote_changes(quote_id, operation) VALUES (new.id, 'create');
+        END
+    """,
+    'quote_changes_au': """
+        CREATE TRIGGER quote_changes_au AFTER UPDATE ON quotes BEGIN
+            INSERT INTO quote_changes(quote_id, operation) VALUES (new.id, 'update');
+        END
+    """,
+    'quote_changes_ad': """
+        CREATE TRIGGER quote_changes_ad AFTER DELETE ON quotes BEGIN
+            INSERT INTO quote_changes(quote_id, operation) VALUES (old.id, 'delete');
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('quote_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('quote_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    for statement in TRIGGERS.values():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('quote_changes')
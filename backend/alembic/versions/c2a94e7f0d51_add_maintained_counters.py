@@ -0,0 +1,106 @@
+"""Add trigger-maintained counters for quote and user totals
+
+Revision ID: c2a94e7f0d51
+Revises: 8d1f5a3e6b20
+Create Date: 2025-10-23 09:41:07.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a94e7f0d51'
+down_revision: Union[str, Sequence[str], None] = '8d1f5a3e6b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS = {
+    'counters_quotes_ai': """
+        CREATE TRIGGER counters_quotes_ai AFTER INSERT ON quotes BEGIN
+            INSERT INTO counters(scope, key, value) VALUES
+                ('quotes', '', 1),
+                ('quotes.category', COALESCE(new.category, ''), 1),
+                ('quotes.author', CAST(new.author AS TEXT), 1),
+                ('quotes.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_quotes_ad': """
+        CREATE TRIGGER counters_quotes_ad AFTER DELETE ON quotes BEGIN
+            INSERT INTO counters(scope, key, value) VALUES
+                ('quotes', '', -1),
+                ('quotes.category', COALESCE(old.category, ''), -1),
+                ('quotes.author', CAST(old.author AS TEXT), -1),
+                ('quotes.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_quotes_au': """
+        CREATE TRIGGER counters_quotes_au AFTER UPDATE ON quotes BEGIN
+            INSERT INTO counters(scope, key, value) VALUES
+                ('quotes.category', COALESCE(old.category, ''), -1),
+                ('quotes.category', COALESCE(new.category, ''), 1),
+                ('quotes.author', CAST(old.author AS TEXT), -1),
+                ('quotes.author', CAST(new.author AS TEXT), 1),
+                ('quotes.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_users_ai': """
+        CREATE TRIGGER counters_users_ai AFTER INSERT ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES ('users', '', 1), ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_users_ad': """
+        CREATE TRIGGER counters_users_ad AFTER DELETE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES ('users', '', -1), ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+    'counters_users_au': """
+        CREATE TRIGGER counters_users_au AFTER UPDATE ON users BEGIN
+            INSERT INTO counters(scope, key, value) VALUES ('users.changes', '', 1)
+            ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('counters',
+    sa.Column('scope', sa.String(length=50), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'key')
+    )
+    for statement in TRIGGERS.values():
+        op.execute(statement)
+
+    # Backfill totals from the existing rows
+    op.execute("INSERT INTO counters(scope, key, value) SELECT 'quotes', '', COUNT(*) FROM quotes")
+    op.execute(
+        """
+        INSERT INTO counters(scope, key, value)
+        SELECT 'quotes.category', COALESCE(category, ''), COUNT(*) FROM quotes GROUP BY COALESCE(category, '')
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO counters(scope, key, value)
+        SELECT 'quotes.author', CAST(author AS TEXT), COUNT(*) FROM quotes GROUP BY author
+        """
+    )
+    op.execute("INSERT INTO counters(scope, key, value) SELECT 'users', '', COUNT(*) FROM users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('counters')
@@ -0,0 +1,52 @@
+"""Add trigger-written user change log for cross-process cache invalidation
+
+Revision ID: c2f7a9d35e61
+Revises: b5e8c2d47f13
+Create Date: 2025-11-06 09:41:27.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7a9d35e61'
+down_revision: Union[str, Sequence[str], None] = 'b5e8c2d47f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS = {
+    'user_changes_au': """
+        CREATE TRIGGER user_changes_au AFTER UPDATE ON users BEGIN
+            INSERT INTO user_changes(user_id) VALUES (new.id);
+        END
+    """,
+    'user_changes_ad': """
+        CREATE TRIGGER user_changes_ad AFTER DELETE ON users BEGIN
+            INSERT INTO user_changes(user_id) VALUES (old.id);
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    for statement in TRIGGERS.values():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('user_changes')
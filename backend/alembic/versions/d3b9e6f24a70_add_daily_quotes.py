@@ -0,0 +1,32 @@
+"""Record the quote of the day per date so every process serves the same pick
+
+Revision ID: d3b9e6f24a70
+Revises: c2f7a9d35e61
+Create Date: 2025-11-10 10:12:44.503917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b9e6f24a70'
+down_revision: Union[str, Sequence[str], None] = 'c2f7a9d35e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_quotes',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('quote_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_quotes')
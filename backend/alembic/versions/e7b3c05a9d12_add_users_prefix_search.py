@@ -0,0 +1,70 @@
+"""Add FTS5 prefix index over user name and email for autocomplete
+
+Revision ID: e7b3c05a9d12
+Revises: c2a94e7f0d51
+Create Date: 2025-10-27 11:18:42.907315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3c05a9d12'
+down_revision: Union[str, Sequence[str], None] = 'c2a94e7f0d51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE users_fts USING fts5(
+            name, email_local, content='', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+            INSERT INTO users_fts(rowid, name, email_local)
+            VALUES (new.id, new.name, substr(new.email, 1, instr(new.email, '@') - 1));
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, name, email_local)
+            VALUES ('delete', old.id, old.name, substr(old.email, 1, instr(old.email, '@') - 1));
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER users_fts_au AFTER UPDATE OF name, email ON users BEGIN
+            INSERT INTO users_fts(users_fts, rowid, name, email_local)
+            VALUES ('delete', old.id, old.name, substr(old.email, 1, instr(old.email, '@') - 1));
+            INSERT INTO users_fts(rowid, name, email_local)
+            VALUES (new.id, new.name, substr(new.email, 1, instr(new.email, '@') - 1));
+        END
+        """
+    )
+    # Backfill the index; contentless tables cannot 'rebuild' from a content table
+    op.execute(
+        """
+        INSERT INTO users_fts(rowid, name, email_local)
+        SELECT id, name, substr(email, 1, instr(email, '@') - 1) FROM users
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+    op.execute("DROP TABLE IF EXISTS users_fts")
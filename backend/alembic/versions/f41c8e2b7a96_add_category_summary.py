@@ -0,0 +1,88 @@
+"""Add trigger-maintained category summary for the category facet
+
+Revision ID: f41c8e2b7a96
+Revises: e7b3c05a9d12
+Create Date: 2025-10-29 16:52:30.114027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41c8e2b7a96'
+down_revision: Union[str, Sequence[str], None] = 'e7b3c05a9d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS = {
+    'category_summary_ai': """
+        CREATE TRIGGER category_summary_ai AFTER INSERT ON quotes
+        WHEN new.category IS NOT NULL BEGIN
+            INSERT INTO category_summary(category, quote_count, latest_created_at)
+            VALUES (new.category, 1, new.created_at)
+            ON CONFLICT(category) DO UPDATE SET
+                quote_count = quote_count + 1,
+                latest_created_at = max(latest_created_at, excluded.latest_created_at);
+        END
+    """,
+    'category_summary_ad': """
+        CREATE TRIGGER category_summary_ad AFTER DELETE ON quotes
+        WHEN old.category IS NOT NULL BEGIN
+            UPDATE category_summary SET
+                quote_count = quote_count - 1,
+                latest_created_at = CASE WHEN old.created_at >= latest_created_at
+                    THEN (SELECT max(created_at) FROM quotes WHERE category = old.category)
+                    ELSE latest_created_at END
+            WHERE category = old.category;
+            DELETE FROM category_summary WHERE category = old.category AND quote_count <= 0;
+        END
+    """,
+    'category_summary_au': """
+        CREATE TRIGGER category_summary_au AFTER UPDATE OF category, created_at ON quotes
+        WHEN old.category IS NOT new.category OR old.created_at IS NOT new.created_at BEGIN
+            UPDATE category_summary SET
+                quote_count = quote_count - 1,
+                latest_created_at = CASE WHEN old.created_at >= latest_created_at
+                    THEN (SELECT max(created_at) FROM quotes WHERE category = old.category AND id != old.id)
+                    ELSE latest_created_at END
+            WHERE category = old.category;
+            DELETE FROM category_summary WHERE category = old.category AND quote_count <= 0;
+            INSERT INTO category_summary(category, quote_count, latest_created_at)
+            SELECT new.category, 1, new.created_at WHERE new.category IS NOT NULL
+            ON CONFLICT(category) DO UPDATE SET
+                quote_count = quote_count + 1,
+                latest_created_at = max(latest_created_at, excluded.latest_created_at);
+        END
+    """,
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_summary',
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('quote_count', sa.Integer(), nullable=False),
+    sa.Column('latest_created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('category')
+    )
+    for statement in TRIGGERS.values():
+        op.execute(statement)
+
+    # Backfill from the existing quotes
+    op.execute(
+        """
+        INSERT INTO category_summary(category, quote_count, latest_created_at)
+        SELECT category, COUNT(*), MAX(created_at) FROM quotes WHERE category IS NOT NULL GROUP BY category
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_table('category_summary')
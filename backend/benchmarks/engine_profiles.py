@@ -0,0 +1,139 @@
+"""
+Read/write throughput of each database engine profile.
+
+Runs concurrent writer threads (one INSERT + COMMIT per operation) and reader threads
+(primary-key lookups) against a fresh temporary SQLite file per profile, and reports
+operations per second, latency percentiles and "database is locked" errors.
+
+    cd backend && python -m benchmarks.engine_profiles --writers 4 --readers 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from src.quotes.core.config import PROFILES, EngineProfile
+from src.quotes.core.database import Base, create_db_engine
+from src.quotes.models.database import Quote, User
+
+# SQLite's own defaults, for comparison with the presets
+BASELINE = EngineProfile(
+    journal_mode="DELETE",
+    synchronous="FULL",
+    mmap_size=0,
+    cache_size=-2000,
+    busy_timeout=0,
+    foreign_keys=False,
+    pool_size=5,
+    max_overflow=10,
+    pool_timeout=30.0,
+)
+
+SEED_QUOTES = 10_000
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_profile(name: str, profile: EngineProfile, writers: int, readers: int, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User).values(id=1, name="Bench", email="bench@example.com"))
+            conn.execute(
+                insert(Quote),
+                [{"text": f"Seed quote {i}", "category": "seed", "author": 1} for i in range(SEED_QUOTES)]
+            )
+
+        stop = threading.Event()
+        lock = threading.Lock()
+        write_latencies: list[float] = []
+        read_latencies: list[float] = []
+        errors = {"write": 0, "read": 0}
+
+        def writer():
+            local, failed = [], 0
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(Quote).values(text="Benchmark quote", category="bench", author=1))
+                    local.append(time.perf_counter() - started)
+                except OperationalError:
+                    failed += 1
+            with lock:
+                write_latencies.extend(local)
+                errors["write"] += failed
+
+        def reader():
+            local, failed = [], 0
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(select(Quote).where(Quote.id == random.randint(1, SEED_QUOTES))).first()
+                    local.append(time.perf_counter() - started)
+                except OperationalError:
+                    failed += 1
+            with lock:
+                read_latencies.extend(local)
+                errors["read"] += failed
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    return {
+        "profile": name,
+        "writes/s": len(write_latencies) / seconds,
+        "write p50 ms": percentile(write_latencies, 50) * 1000,
+        "write p99 ms": percentile(write_latencies, 99) * 1000,
+        "write errors": errors["write"],
+        "reads/s": len(read_latencies) / seconds,
+        "read p50 ms": percentile(read_latencies, 50) * 1000,
+        "read p99 ms": percentile(read_latencies, 99) * 1000,
+        "read errors": errors["read"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark database engine profiles")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="*", default=["baseline", *PROFILES])
+    args = parser.parse_args()
+
+    profiles = {"baseline": BASELINE, **PROFILES}
+    results = [
+        run_profile(name, profiles[name], args.writers, args.readers, args.seconds)
+        for name in args.profiles
+    ]
+
+    columns = list(results[0])
+    widths = [max(len(column), 10) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for result in results:
+        cells = [
+            f"{value:.1f}" if isinstance(value, float) else str(value)
+            for value in result.values()
+        ]
+        print("  ".join(cell.rjust(width) for cell, width in zip(cells, widths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,467 @@
+"""
+End-to-end latency and throughput of every quote and user route.
+
+Seeds a temporary SQLite file with a synthetic dataset, then drives the ASGI app in-process
+through httpx (no server, no sockets) with concurrent clients per route, and reports requests
+per second and p50/p95/p99 latency as the median of --repeat measurements. Results can be saved
+as a baseline and later runs compared against it: the run fails when a route's p95 grows, or
+its throughput drops, by more than the threshold or, for a noisier route, by more than twice
+the spread its p95 showed across the baseline's repeats.
+
+    cd backend && python -m benchmarks.http_routes --dataset small --save-baseline
+    cd backend && python -m benchmarks.http_routes --dataset small --compare
+
+Baselines are only comparable on the same machine, dataset and settings, so they are recorded
+locally rather than committed; they live in benchmarks/baselines/<dataset>.json (ignored by
+git) unless --baseline points elsewhere. Seeding the large
+dataset takes a while, so --data-dir keeps seeded files around for reuse; each run first
+deletes the quotes earlier runs wrote, so runs start from the same data.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+DATASETS = {
+    "small": 10_000,
+    "medium": 1_000_000,
+    "large": 10_000_000,
+}
+
+# One user per this many quotes
+QUOTES_PER_USER = 10
+
+CATEGORIES = [f"category-{i}" for i in range(20)]
+
+SEED_BATCH = 50_000
+
+# Seeded quotes are dated 2024, so quotes created after this are the ones the write routes added
+WRITTEN_AFTER = "2025-01-01T00:00:00"
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def make_words(rng: random.Random, count: int) -> list[str]:
+    syllables = ["ka", "lo", "mi", "ra", "ten", "vo", "shi", "del", "an", "or", "pe", "qua", "sul", "bri", "et"]
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+@dataclass
+class Dataset:
+    """Shape of the seeded data, shared with the request builders"""
+    quotes: int
+    users: int
+    vocabulary: list[str]
+    first_names: list[str]
+    rng: random.Random = field(default_factory=lambda: random.Random(7))
+
+
+def seed(path: str, quotes: int) -> Dataset:
+    """Create the schema and fill it with quotes and users; reuses a file seeded earlier"""
+    from src.quotes.core.database import Base, create_db_engine
+    from src.quotes.core.config import load_profile
+    import src.quotes.models.database  # noqa: F401  registers the models and DDL on Base
+
+    rng = random.Random(42)
+    dataset = Dataset(
+        quotes=quotes,
+        users=max(1, quotes // QUOTES_PER_USER),
+        vocabulary=make_words(rng, 2000),
+        first_names=[name.title() for name in make_words(rng, 500)],
+    )
+    last_names = [name.title() for name in make_words(rng, 2000)]
+
+    if os.path.exists(path):
+        return dataset
+
+    engine = create_db_engine(f"sqlite:///{path}", load_profile())
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    # Raw sqlite3 keeps seeding fast; timestamps are written in the same text format as
+    # CURRENT_TIMESTAMP so keyset cursors compare correctly
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    started = time.perf_counter()
+
+    for start in range(1, dataset.users + 1, SEED_BATCH):
+        rows = []
+        for user_id in range(start, min(start + SEED_BATCH, dataset.users + 1)):
+            first, last = rng.choice(dataset.first_names), rng.choice(last_names)
+            rows.append((user_id, f"{first} {last}", f"{first.lower()}.{last.lower()}{user_id}@example.com"))
+        conn.executemany(
+            "INSERT INTO users(id, name, email, created_at, updated_at) "
+            "VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)",
+            rows,
+        )
+        conn.commit()
+
+    for start in range(1, quotes + 1, SEED_BATCH):
+        rows = []
+        for quote_id in range(start, min(start + SEED_BATCH, quotes + 1)):
+            text = " ".join(rng.choices(dataset.vocabulary, k=rng.randint(6, 16)))
+            category = rng.choice(CATEGORIES) if quote_id % 5 else None
+            rows.append((quote_id, text, category, rng.randint(1, dataset.users), quote_id))
+        conn.executemany(
+            "INSERT INTO quotes(id, text, category, author, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, datetime('2024-01-01', '+' || ? || ' seconds'), CURRENT_TIMESTAMP)",
+            rows,
+        )
+        conn.commit()
+        print(f"  seeded {min(start + SEED_BATCH - 1, quotes):,} / {quotes:,} quotes", file=sys.stderr)
+
+    conn.execute("PRAGMA optimize")
+    conn.close()
+    print(f"  seeding took {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return dataset
+
+
+@dataclass
+class Scenario:
+    """One route under test; build returns the URL and JSON body of the next request"""
+    name: str
+    method: str
+    build: Callable[["Context"], tuple[str, Optional[object]]]
+
+
+@dataclass
+class Context:
+    """State shared by the request builders of one run"""
+    dataset: Dataset
+    cursor: Optional[str] = None
+    changes_cursor: Optional[str] = None
+    created_quotes: list[int] = field(default_factory=list)
+    created_users: list[int] = field(default_factory=list)
+    authors: list[int] = field(default_factory=list)
+    deletions: list[int] = field(default_factory=list)
+    sequence: int = 0
+
+    @property
+    def rng(self) -> random.Random:
+        return self.dataset.rng
+
+    def quote_id(self) -> int:
+        return self.rng.randint(1, self.dataset.quotes)
+
+    def user_id(self) -> int:
+        return self.rng.randint(1, self.dataset.users)
+
+    def next_sequence(self) -> int:
+        self.sequence += 1
+        return self.sequence
+
+
+def _new_quote(ctx: Context) -> dict:
+    return {
+        "text": " ".join(ctx.rng.choices(ctx.dataset.vocabulary, k=10)),
+        "category": ctx.rng.choice(CATEGORIES),
+        "author": ctx.user_id(),
+    }
+
+
+SCENARIOS = [
+    Scenario("GET /quotes/", "GET", lambda ctx: ("/quotes/?per_page=20", None)),
+    Scenario("GET /quotes/ deep page", "GET", lambda ctx: ("/quotes/?per_page=20&page=100", None)),
+    Scenario("GET /quotes/ cursor", "GET", lambda ctx: (f"/quotes/?per_page=20&cursor={ctx.cursor}", None)),
+    Scenario(
+        "GET /quotes/ category",
+        "GET",
+        lambda ctx: (f"/quotes/?per_page=20&category={ctx.rng.choice(CATEGORIES)}", None),
+    ),
+    Scenario("GET /quotes/ expand", "GET", lambda ctx: ("/quotes/?per_page=20&expand=author", None)),
+    Scenario(
+        "GET /quotes/search",
+        "GET",
+        lambda ctx: (f"/quotes/search?q={ctx.rng.choice(ctx.dataset.vocabulary)}", None),
+    ),
+    Scenario(
+        "GET /quotes/batch",
+        "GET",
+        lambda ctx: ("/quotes/batch?ids=" + ",".join(str(ctx.quote_id()) for _ in range(20)), None),
+    ),
+    Scenario("GET /quotes/categories", "GET", lambda ctx: ("/quotes/categories", None)),
+    Scenario("GET /quotes/random", "GET", lambda ctx: ("/quotes/random", None)),
+    Scenario("GET /quotes/daily", "GET", lambda ctx: ("/quotes/daily", None)),
+    Scenario("GET /quotes/export", "GET", lambda ctx: (f"/quotes/export?author={ctx.user_id()}", None)),
+    Scenario("GET /quotes/{id}", "GET", lambda ctx: (f"/quotes/{ctx.quote_id()}", None)),
+    Scenario("POST /quotes/", "POST", lambda ctx: ("/quotes/", _new_quote(ctx))),
+    Scenario("POST /quotes/bulk", "POST", lambda ctx: ("/quotes/bulk", [_new_quote(ctx) for _ in range(100)])),
+    Scenario(
+        "PUT /quotes/{id}",
+        "PUT",
+        lambda ctx: (f"/quotes/{ctx.quote_id()}", {"category": ctx.rng.choice(CATEGORIES)}),
+    ),
+    Scenario("DELETE /quotes/{id}", "DELETE", lambda ctx: (f"/quotes/{ctx.created_quotes.pop()}", None)),
+    Scenario(
+        "PATCH /quotes/",
+        "PATCH",
+        lambda ctx: (
+            "/quotes/?ids=" + ",".join(str(ctx.quote_id()) for _ in range(20)),
+            {"category": ctx.rng.choice(CATEGORIES)},
+        ),
+    ),
+    Scenario(
+        "DELETE /quotes/",
+        "DELETE",
+        lambda ctx: (f"/quotes/?author={ctx.user_id()}&created_after={WRITTEN_AFTER}", None),
+    ),
+    # A client catching up on a full page of the changes the write scenarios above made
+    Scenario(
+        "GET /quotes/changes",
+        "GET",
+        lambda ctx: (f"/quotes/changes?limit=100&since={ctx.changes_cursor}", None),
+    ),
+    Scenario("GET /users/", "GET", lambda ctx: ("/users/?per_page=20", None)),
+    Scenario(
+        "GET /users/search",
+        "GET",
+        lambda ctx: (f"/users/search?prefix={ctx.rng.choice(ctx.dataset.first_names)[:3]}", None),
+    ),
+    Scenario(
+        "GET /users/batch",
+        "GET",
+        lambda ctx: ("/users/batch?ids=" + ",".join(str(ctx.user_id()) for _ in range(20)), None),
+    ),
+    Scenario(
+        "GET /users/export",
+        "GET",
+        lambda ctx: (f"/users/export?name={ctx.rng.choice(ctx.dataset.first_names)}", None),
+    ),
+    Scenario("GET /users/{id}", "GET", lambda ctx: (f"/users/{ctx.user_id()}", None)),
+    Scenario(
+        "POST /users/",
+        "POST",
+        lambda ctx: ("/users/", {"name": "Bench User", "email": f"bench{ctx.next_sequence()}@bench.example"}),
+    ),
+    Scenario("PUT /users/{id}", "PUT", lambda ctx: (f"/users/{ctx.user_id()}", {"name": "Renamed User"})),
+    Scenario("DELETE /users/{id}", "DELETE", lambda ctx: (f"/users/{ctx.created_users.pop()}", None)),
+    Scenario("DELETE /users/{id} with quotes", "DELETE", lambda ctx: (f"/users/{ctx.authors.pop()}", None)),
+    Scenario(
+        "GET /users/deletions/{id}",
+        "GET",
+        lambda ctx: (f"/users/deletions/{ctx.rng.choice(ctx.deletions)}", None),
+    ),
+]
+
+
+async def create_authors(client, ctx: Context, count: int) -> None:
+    """Create users with a few quotes each for the cascade delete scenario to remove"""
+    for _ in range(count):
+        response = await client.post(
+            "/users/", json={"name": "Bench Author", "email": f"author{ctx.next_sequence()}@bench.example"}
+        )
+        ctx.authors.append(response.json()["data"]["id"])
+    quotes = [{**_new_quote(ctx), "author": author} for author in ctx.authors for _ in range(QUOTES_PER_USER)]
+    await client.post("/quotes/bulk", json=quotes)
+
+
+async def run_scenario(client, ctx: Context, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            url, body = scenario.build(ctx)
+            started = time.perf_counter()
+            response = await client.request(scenario.method, url, json=body)
+            await response.aread()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            elif scenario.name == "POST /quotes/":
+                ctx.created_quotes.append(response.json()["data"]["id"])
+            elif scenario.name == "POST /users/":
+                ctx.created_users.append(response.json()["data"]["id"])
+            elif scenario.name == "DELETE /users/{id} with quotes" and response.status_code == 202:
+                ctx.deletions.append(response.json()["data"]["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests/s": len(latencies) / elapsed,
+        "p50 ms": percentile(latencies, 50) * 1000,
+        "p95 ms": percentile(latencies, 95) * 1000,
+        "p99 ms": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+
+
+async def measure(client, ctx: Context, scenario: Scenario, requests: int, concurrency: int, repeat: int) -> dict:
+    """Median of repeated runs, with the relative spread of their p95 as the route's noise level"""
+    runs = [await run_scenario(client, ctx, scenario, requests, concurrency) for _ in range(repeat)]
+    result = {
+        metric: statistics.median(run[metric] for run in runs)
+        for metric in ("requests/s", "p50 ms", "p95 ms", "p99 ms")
+    }
+    result["errors"] = max(run["errors"] for run in runs)
+    p95s = [run["p95 ms"] for run in runs]
+    result["p95 spread"] = (max(p95s) - min(p95s)) / result["p95 ms"] if result["p95 ms"] else 0.0
+    return result
+
+
+async def run_suite(
+    dataset: Dataset, requests: int, concurrency: int, warmup: int, repeat: int, only: list[str]
+) -> dict:
+    import httpx
+    from main import app
+
+    # Unhandled app errors come back as 500s and are counted, rather than aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ctx = Context(dataset)
+        # Start from the seeded data, without the quotes earlier runs on this file wrote
+        await client.delete(f"/quotes/?created_after={WRITTEN_AFTER}&chunk_size=10000")
+        first_page = (await client.get("/quotes/?per_page=100&include_total=false")).json()
+        ctx.cursor = first_page["next_cursor"]
+        ctx.changes_cursor = (await client.get("/quotes/changes")).json()["next_cursor"]
+
+        results = {}
+        for scenario in SCENARIOS:
+            if only and not any(pattern in scenario.name for pattern in only):
+                continue
+            # DELETE scenarios of a single id consume what the matching POST scenario created,
+            # except the cascade delete, which gets authors created for it here
+            if scenario.method == "DELETE" and "{id}" in scenario.name:
+                if scenario.name == "DELETE /users/{id} with quotes":
+                    await create_authors(client, ctx, requests * repeat)
+                pool = {
+                    "DELETE /quotes/{id}": ctx.created_quotes,
+                    "DELETE /users/{id}": ctx.created_users,
+                    "DELETE /users/{id} with quotes": ctx.authors,
+                }[scenario.name]
+                count = min(requests, len(pool) // repeat)
+                if count == 0:
+                    continue
+                results[scenario.name] = await measure(client, ctx, scenario, count, concurrency, repeat)
+            elif scenario.name == "GET /users/deletions/{id}" and not ctx.deletions:
+                continue
+            else:
+                if warmup:
+                    await run_scenario(client, ctx, scenario, warmup, concurrency)
+                results[scenario.name] = await measure(client, ctx, scenario, requests, concurrency, repeat)
+            print(f"  {scenario.name}: {results[scenario.name]['p50 ms']:.2f} ms p50", file=sys.stderr)
+        return results
+
+
+def print_table(results: dict, baseline: Optional[dict]) -> None:
+    columns = ["requests/s", "p50 ms", "p95 ms", "p99 ms", "errors"]
+    if baseline:
+        columns.append("p95 vs base")
+    width = max(len(name) for name in results)
+    print(f"{'route'.ljust(width)}  " + "  ".join(column.rjust(11) for column in columns))
+    for name, result in results.items():
+        cells = [f"{result[column]:.1f}" if column != "errors" else str(result[column]) for column in columns[:5]]
+        if baseline:
+            base = baseline.get(name)
+            cells.append(f"{(result['p95 ms'] / base['p95 ms'] - 1) * 100:+.0f}%" if base else "new")
+        print(f"{name.ljust(width)}  " + "  ".join(cell.rjust(11) for cell in cells))
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Routes whose p95 latency or throughput moved in the wrong direction beyond their tolerance:
+    the threshold, or twice the p95 spread the route showed while the baseline was recorded
+    """
+    failures = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        tolerance = max(threshold, 2 * base.get("p95 spread", 0.0))
+        if result["p95 ms"] > base["p95 ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {base['p95 ms']:.2f} -> {result['p95 ms']:.2f} ms (tolerance {tolerance:.0%})")
+        if result["requests/s"] < base["requests/s"] * (1 - min(tolerance, 0.9)):
+            failures.append(f"{name}: throughput {base['requests/s']:.1f} -> {result['requests/s']:.1f} req/s")
+        if result["errors"] > base["errors"]:
+            failures.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark every HTTP route against a seeded dataset")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), default="small")
+    parser.add_argument("--quotes", type=int, help="Seed this many quotes instead of the dataset's size")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per route")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per route first")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per route; their median is reported")
+    parser.add_argument("--only", nargs="*", default=[], help="Run routes whose name contains any of these")
+    parser.add_argument("--data-dir", help="Keep seeded databases here and reuse them across runs")
+    parser.add_argument("--baseline", type=Path, help="Baseline file (default benchmarks/baselines/<dataset>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if results regress against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+
+    quotes = args.quotes or DATASETS[args.dataset]
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="quotes-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench-{quotes}.db")
+    # Settings are read at import time, so point the app at the benchmark database first
+    os.environ["QUOTES_DATABASE_PATH"] = path
+
+    print(f"Seeding {quotes:,} quotes into {path}", file=sys.stderr)
+    dataset = seed(path, quotes)
+    results = asyncio.run(
+        run_suite(dataset, args.requests, args.concurrency, args.warmup, args.repeat, args.only)
+    )
+    settings = {
+        "requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency, "repeat": args.repeat
+    }
+
+    baseline_path = args.baseline or BASELINE_DIR / f"{args.dataset if not args.quotes else quotes}.json"
+    baseline = None
+    if args.compare:
+        if not baseline_path.exists():
+            sys.exit(f"No baseline at {baseline_path}; run with --save-baseline first")
+        saved = json.loads(baseline_path.read_text())
+        if saved["quotes"] != quotes:
+            sys.exit(f"Baseline was recorded with {saved['quotes']:,} quotes, this run has {quotes:,}")
+        if saved.get("settings") != settings:
+            sys.exit(f"Baseline was recorded with {saved.get('settings')}, this run uses {settings}")
+        baseline = saved["routes"]
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({"quotes": quotes, "settings": settings, "routes": results}, indent=2) + "\n")
+        print(f"Saved baseline to {baseline_path}")
+
+    if baseline is not None:
+        failures = regressions(results, baseline, args.threshold)
+        if failures:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
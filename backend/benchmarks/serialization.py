@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of response serialization for a page of quotes.
+
+Compares FastAPI's default response_model path (validated construction, dump, re-validation
+against response_model, JSON encoding) with the trusted path: model_construct from ORM rows and
+TrustedJSONResponse writing the envelope straight to bytes.
+
+    cd backend && python -m benchmarks.serialization --per-page 100
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from src.quotes.api.schemas import Quote, QuotesListResponse
+from src.quotes.api.serialization import TrustedJSONResponse, type_adapter
+from src.quotes.services.quotes import QuoteService
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        SimpleNamespace(
+            id=i,
+            text=f"Quote number {i}: the only thing we have to fear is fear itself.",
+            category="inspiration" if i % 2 else None,
+            author=i % 50 + 1,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def default_path(rows) -> bytes:
+    quotes = [
+        Quote(
+            id=row.id,
+            text=row.text,
+            category=row.category,
+            author=row.author,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in rows
+    ]
+    envelope = QuotesListResponse(
+        success=True, message="Retrieved quotes", data=quotes, total=len(rows), page=1, per_page=len(rows)
+    )
+    # What FastAPI does with a returned model when response_model is set
+    adapter = type_adapter(QuotesListResponse)
+    validated = adapter.validate_python(envelope.model_dump())
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def trusted_path(rows) -> bytes:
+    quotes = [QuoteService._convert_to_pydantic(row) for row in rows]
+    envelope = QuotesListResponse(
+        success=True, message="Retrieved quotes", data=quotes, total=len(rows), page=1, per_page=len(rows)
+    )
+    return TrustedJSONResponse(envelope).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.per_page)
+    assert json.loads(default_path(rows)) == json.loads(trusted_path(rows))
+
+    results = {}
+    for name, func in (("default", default_path), ("trusted", trusted_path)):
+        best = min(timeit.repeat(lambda: func(rows), number=args.number, repeat=5))
+        results[name] = best / args.number * 1e6
+        print(f"{name:>8}: {results[name]:8.1f} us per page of {args.per_page}")
+
+    print(f" speedup: {results['default'] / results['trusted']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,44 @@
 from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from src.quotes.api.schemas import HealthCheckResponse
+from src.quotes.api.schemas import HealthCheckResponse, QueryDiagnosticsSettings
 from src.quotes.api.quote_routes import router as quotes_router
 from src.quotes.api.user_routes import router as users_router
-from src.quotes.core.database import create_tables
+from src.quotes.core.database import (
+    ReadYourWritesMiddleware, create_tables, engine, async_engine, async_read_engine
+)
+from src.quotes.core.cache import cache_stats
+from src.quotes.services.coalescer import quote_writes
+from src.quotes.services.user_deletions import user_deletions
+from src.quotes.services.changes import change_log_pruner, quote_changes
+from src.quotes.services.cache_sync import cache_sync
+from src.quotes.core import diagnostics
+from src.quotes.core.metrics import MetricsMiddleware, register_pools, render_metrics, track_in_flight
 from src.quotes.admin.admin import setup_admin
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    await cache_sync.start()
+    await user_deletions.resume()
+    await change_log_pruner.start()
     yield
+    await user_deletions.close()
+    await change_log_pruner.close()
+    await quote_changes.close()
+    await cache_sync.close()
+    if quote_writes is not None:
+        await quote_writes.close()
 
 
 app = FastAPI(
     title="Quotes API",
     description="A simple API for managing quotes",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    dependencies=[Depends(track_in_flight)]
 )
 
 # Add CORS middleware
@@ -31,6 +50,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(diagnostics.QueryDiagnosticsMiddleware)
+# Outermost, so latency covers the whole stack
+app.add_middleware(MetricsMiddleware)
+register_pools({
+    "writer": engine,
+    "async_writer": async_engine.sync_engine,
+    "async_reader": async_read_engine.sync_engine,
+})
+
 # Include the routers
 app.include_router(quotes_router)
 app.include_router(users_router)
@@ -56,4 +85,29 @@ def health_check():
         status="healthy",
         timestamp=datetime.now(),
         version="1.0.0"
-    )
\ No newline at end of file
+    )
+
+
+@app.get("/cache/stats", response_model=dict)
+def get_cache_stats():
+    """Size, hit, miss and eviction counters for the entity caches"""
+    return cache_stats()
+
+
+@app.get("/diagnostics/queries", response_model=dict)
+def get_query_diagnostics():
+    """Query diagnostics settings with the most recent slow query and N+1 reports"""
+    return diagnostics.report()
+
+
+@app.put("/diagnostics/queries", response_model=dict)
+def update_query_diagnostics(update: QueryDiagnosticsSettings):
+    """Switch query diagnostics on or off and tune their thresholds without a restart"""
+    diagnostics.configure(update.enabled, update.slow_query_ms, update.n_plus_one_threshold)
+    return diagnostics.report()
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request, database and pool metrics in the Prometheus text format"""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
\ No newline at end of file
@@ -1,22 +1,139 @@
+from html import escape
+from typing import List, Optional
 from fastapi import Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
 from sqladmin import Admin, ModelView, action
-from src.quotes.core.database import engine
-from src.quotes.models.database import Quote
+from sqlalchemy import Select, Subquery, asc, desc, false, func, or_, select, text
+from src.quotes.core.cache import quote_cache
+from src.quotes.core.database import engine, AsyncSessionLocal
+from src.quotes.models.database import Counter, Quote, quotes_fts
+from src.quotes.services.quotes import AsyncQuoteService, QuoteService
+from src.quotes.api.schemas import QuoteFilter, QuoteUpdate
+
+# Searches count at most this many matches; the pager stops there
+SEARCH_COUNT_LIMIT = 10_000
 
 
 class QuoteAdmin(ModelView, model=Quote):
     column_list = [Quote.id, Quote.text, Quote.author, Quote.category, Quote.created_at]
     column_searchable_list = [Quote.text, Quote.author, Quote.category]
     column_sortable_list = [Quote.id, Quote.author, Quote.category, Quote.created_at]
+    column_default_sort = [("id", True)]
     form_columns = [Quote.text, Quote.author, Quote.category]
-    
-    @action(name="print_selected", label="Print Selected Quotes")
-    async def print_selected_quotes(self, request: Request):
-        print("Print selected quotes action executed!")
-        
-        # Redirect back to the admin page after action
-        return RedirectResponse(url="/admin/quote/list", status_code=302)
+
+    async def after_model_change(self, data, model, is_created, request):
+        # Admin edits bypass QuoteService, so drop the cached copy here
+        quote_cache.invalidate(model.id)
+
+    async def after_model_delete(self, model, request):
+        quote_cache.invalidate(model.id)
+
+    def search_query(self, stmt, term):
+        """
+        Indexed search: a number matches the quote id or author id, anything else matches
+        quote text through the full-text index or the category exactly.
+        """
+        term = term.strip()
+        if term.isdigit():
+            return stmt.where(or_(Quote.id == int(term), Quote.author == int(term)))
+
+        try:
+            match = QuoteService._fts_query(term)
+        except ValueError:
+            return stmt.where(false())
+        matching_ids = select(quotes_fts.c.rowid).where(text("quotes_fts MATCH :match").bindparams(match=match))
+        return stmt.where(or_(Quote.id.in_(matching_ids), Quote.category == term))
+
+    def sort_query(self, stmt, request: Request):
+        """SQLAdmin's sorting with Quote.id as the tiebreak, so rows with equal sort values page stably"""
+        sort_by = request.query_params.get("sortBy")
+        if sort_by in self._sort_fields:
+            descending = request.query_params.get("sort", "asc") == "desc"
+        else:
+            descending = self._get_default_sort()[0][1]
+        return super().sort_query(stmt, request).order_by(desc(Quote.id) if descending else asc(Quote.id))
+
+    def count_query(self, request: Request):
+        """The unfiltered total, read from the maintained counters instead of COUNT(*)"""
+        return select(func.coalesce(func.sum(Counter.value), 0)).where(Counter.scope == "quotes", Counter.key == "")
+
+    async def count(self, request: Request, stmt=None) -> int:
+        """
+        The list page counts its rows by wrapping the listing query; an unfiltered listing is
+        answered by count_query and a filtered one is counted up to SEARCH_COUNT_LIMIT.
+        """
+        froms = stmt.get_final_froms() if stmt is not None else []
+        if len(froms) == 1 and isinstance(froms[0], Subquery) and isinstance(froms[0].element, Select):
+            listed = froms[0].element
+            if listed.whereclause is None:
+                stmt = None
+            else:
+                capped = listed.order_by(None).limit(SEARCH_COUNT_LIMIT)
+                stmt = select(func.count()).select_from(capped.subquery())
+        return await super().count(request, stmt)
+
+    @action(
+        name="delete_selected",
+        label="Delete selected (single statement)",
+        confirmation_message="Delete every selected quote?"
+    )
+    async def delete_selected(self, request: Request):
+        ids = self._selected_ids(request)
+        async with AsyncSessionLocal() as db:
+            await AsyncQuoteService(db).delete_quotes(QuoteFilter(ids=ids))
+        return self._back_to_list(request)
+
+    @action(name="set_category", label="Set category of selected")
+    async def set_category(self, request: Request):
+        category = request.query_params.get("category")
+        if category is None:
+            return self._value_form(request, "category", "New category", "text")
+        if not category.strip():
+            return self._back_to_list(request, error="Category must not be empty")
+        return await self._update_selected(request, QuoteUpdate(category=category.strip()))
+
+    @action(name="reassign_author", label="Reassign author of selected")
+    async def reassign_author(self, request: Request):
+        author = request.query_params.get("author")
+        if author is None:
+            return self._value_form(request, "author", "New author id", "number")
+        if not author.strip().isdigit():
+            return self._back_to_list(request, error=f"Invalid author id: {author}")
+        return await self._update_selected(request, QuoteUpdate(author=int(author)))
+
+    async def _update_selected(self, request: Request, quote_update: QuoteUpdate):
+        try:
+            async with AsyncSessionLocal() as db:
+                await AsyncQuoteService(db).update_quotes(QuoteFilter(ids=self._selected_ids(request)), quote_update)
+        except ValueError as e:
+            return self._back_to_list(request, error=str(e))
+        return self._back_to_list(request)
+
+    @staticmethod
+    def _selected_ids(request: Request) -> List[int]:
+        pks = request.query_params.get("pks", "")
+        return [int(pk) for pk in pks.split(",") if pk.strip().isdigit()]
+
+    @staticmethod
+    def _back_to_list(request: Request, error: Optional[str] = None) -> RedirectResponse:
+        url = request.url_for("admin:list", identity="quote")
+        if error:
+            url = url.include_query_params(error=error)
+        return RedirectResponse(url=str(url), status_code=302)
+
+    @staticmethod
+    def _value_form(request: Request, name: str, label: str, input_type: str) -> HTMLResponse:
+        """Minimal page asking for the value a bulk action applies; it submits back to the action"""
+        pks = escape(request.query_params.get("pks", ""))
+        count = len(QuoteAdmin._selected_ids(request))
+        return HTMLResponse(
+            f"<form method=\"get\" action=\"{escape(request.url.path)}\">"
+            f"<p>{count} quotes selected</p>"
+            f"<input type=\"hidden\" name=\"pks\" value=\"{pks}\">"
+            f"<label>{escape(label)} <input type=\"{input_type}\" name=\"{name}\" required></label> "
+            f"<button type=\"submit\">Apply</button>"
+            f"</form>"
+        )
 
 
 def setup_admin(app):
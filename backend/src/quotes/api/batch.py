@@ -0,0 +1,20 @@
+"""
+Helpers for batch fetch routes.
+Ids arrive as one comma-separated query parameter and are answered with a single IN query.
+"""
+from fastapi import HTTPException
+
+# Upper bound on ids per batch request, well under SQLite's bound parameter limit
+MAX_BATCH_IDS = 100
+
+# Accepted shape of the ids query parameter, e.g. "3,17,42"
+IDS_PATTERN = r"^\d+(,\d+)*$"
+
+
+def parse_ids(ids: str) -> list[int]:
+    """Distinct ids from a comma-separated list, in the order they were given"""
+    parsed = list(dict.fromkeys(int(value) for value in ids.split(",")))
+    if len(parsed) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
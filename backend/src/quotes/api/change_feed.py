@@ -0,0 +1,51 @@
+"""
+Delivery of the quote change feed as long-poll responses or Server-Sent Events.
+Each read opens its own short read session, so a client waiting between reads holds no
+connection and every read sees the latest committed changes.
+"""
+from typing import AsyncIterator, List
+from fastapi.responses import StreamingResponse
+from src.quotes.core.database import async_read_session
+from src.quotes.core.pagination import decode_cursor
+from src.quotes.services.changes import AsyncChangeService, quote_changes
+from src.quotes.api.schemas import QuoteChange
+
+EVENT_STREAM = "text/event-stream"
+
+# Seconds between keep-alive comments on an idle event stream, so proxies keep it open
+HEARTBEAT_SECONDS = 15.0
+
+
+async def read_changes(after: int, limit: int) -> List[QuoteChange]:
+    """Changes after the given change id, read in a fresh session"""
+    async with async_read_session() as db:
+        return await AsyncChangeService(db).get_changes(after, limit)
+
+
+async def wait_for_changes(after: int, limit: int, timeout: float) -> List[QuoteChange]:
+    """Changes after the given change id, waiting up to timeout seconds for one when there are none yet"""
+    changes = await read_changes(after, limit)
+    if not changes and timeout > 0 and await quote_changes.wait(after, timeout):
+        changes = await read_changes(after, limit)
+    return changes
+
+
+async def _events(after: int, limit: int) -> AsyncIterator[str]:
+    # Runs until the client disconnects, at which point StreamingResponse cancels it
+    while True:
+        changes = await read_changes(after, limit)
+        for change in changes:
+            yield f"id: {change.cursor}\nevent: {change.operation}\ndata: {change.model_dump_json()}\n\n"
+        if changes:
+            (after,) = decode_cursor(changes[-1].cursor, 1)
+        if len(changes) < limit and not await quote_changes.wait(after, HEARTBEAT_SECONDS):
+            yield ": keep-alive\n\n"
+
+
+def event_stream_response(after: int, limit: int) -> StreamingResponse:
+    """Stream changes after the given change id as Server-Sent Events, one event per change"""
+    return StreamingResponse(
+        _events(after, limit),
+        media_type=EVENT_STREAM,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
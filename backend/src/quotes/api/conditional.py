@@ -0,0 +1,74 @@
+"""
+Conditional GET support.
+Builds ETag / Last-Modified validators and evaluates If-None-Match / If-Modified-Since,
+so unchanged resources can be answered with 304 before any response body is built.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+
+def _digest(parts: tuple) -> str:
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def strong_etag(*parts) -> str:
+    """Strong ETag for a single resource, derived from its field values"""
+    return f'"{_digest(parts)}"'
+
+
+def weak_etag(*parts) -> str:
+    """Weak ETag for a list page, derived from a summary of the filtered set"""
+    return f'W/"{_digest(parts)}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes holding UTC (CURRENT_TIMESTAMP)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict[str, str]:
+    """ETag and Last-Modified headers for a response"""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluate the request's preconditions against the current validators.
+    If-None-Match wins over If-Modified-Since when both are sent, and uses weak comparison.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag.removeprefix("W/")
+        return any(
+            candidate.strip().removeprefix("W/") == opaque
+            for candidate in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    """Empty 304 response carrying the current validators"""
+    return Response(status_code=304, headers=headers)
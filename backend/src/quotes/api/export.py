@@ -0,0 +1,54 @@
+"""
+Streaming export responses.
+Rows arrive from the service layer in partitions and are encoded one partition at a time,
+so memory use stays flat regardless of how many rows are exported.
+"""
+import csv
+import io
+from typing import AsyncIterator, Sequence
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+EXPORT_FORMAT_PATTERN = "^(ndjson|csv)$"
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _ndjson(partitions: AsyncIterator[Sequence[BaseModel]]) -> AsyncIterator[str]:
+    async for partition in partitions:
+        yield "".join(item.model_dump_json() + "\n" for item in partition)
+
+
+async def _csv(partitions: AsyncIterator[Sequence[BaseModel]], fields: list[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    async for partition in partitions:
+        for item in partition:
+            row = item.model_dump(mode="json", include=set(fields))
+            writer.writerow([row[field] for field in fields])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(
+    partitions: AsyncIterator[Sequence[BaseModel]],
+    format: str,
+    fields: list[str],
+    filename: str
+) -> StreamingResponse:
+    """Stream partitions of models as NDJSON or CSV with a download filename"""
+    body = _csv(partitions, fields) if format == "csv" else _ndjson(partitions)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
@@ -1,96 +1,527 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
-from src.quotes.core.database import get_db
-from src.quotes.services.quotes import QuoteService
-from src.quotes.api.schemas import QuoteCreate, QuoteUpdate, QuoteResponse, QuotesListResponse
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.core.database import get_async_db, get_async_read_db, async_read_session
+from src.quotes.core.pagination import encode_cursor
+from src.quotes.services.quotes import AsyncQuoteService, BULK_CHUNK_SIZE
+from src.quotes.services.users import AsyncUserService
+from src.quotes.services.categories import AsyncCategoryService
+from src.quotes.services.coalescer import quote_writes
+from src.quotes.services.changes import AsyncChangeService, CursorExpiredError
+from src.quotes.api.schemas import (
+    QuoteCreate, QuoteUpdate, QuoteFilter, QuoteResponse, QuotesListResponse, QuotesBatchResponse,
+    QuoteSearchResponse, BulkQuoteError, BulkQuotesResponse, BulkChangeResponse, CategoriesResponse,
+    QuoteChangesResponse
+)
+from src.quotes.api.batch import parse_ids, IDS_PATTERN
+from src.quotes.api.streaming import iter_json_records
+from src.quotes.api.export import export_response, EXPORT_FORMAT_PATTERN
+from src.quotes.api.change_feed import EVENT_STREAM, event_stream_response, wait_for_changes
+from src.quotes.api.conditional import (
+    strong_etag, weak_etag, validator_headers, is_not_modified, not_modified_response
+)
+from src.quotes.api.serialization import ResponseRenderer
 
 router = APIRouter(prefix="/quotes", tags=["quotes"])
+respond = ResponseRenderer("quotes")
+
+# Accepted values of the expand query parameter
+EXPAND_PATTERN = "^author$"
+
+# Cap on per-row errors echoed back from a bulk request; the failed count stays exact
+MAX_BULK_ERRORS = 1000
+
+# Bulk chunks from concurrent requests take turns at the write lock here, on the event loop,
+# rather than in SQLite's busy handler, where a queue of them can outlast busy_timeout
+bulk_writes = asyncio.Lock()
 
 
 @router.post("/", response_model=QuoteResponse, status_code=201)
-async def create_quote(quote: QuoteCreate, db: Session = Depends(get_db)):
-    """Create a new quote"""
+async def create_quote(quote: QuoteCreate, db: AsyncSession = Depends(get_async_db)):
+    """Create a new quote; concurrent creates share a transaction when write coalescing is on"""
+    
+    try:
+        if quote_writes is not None:
+            created_quote = await quote_writes.create_quote(quote)
+        else:
+            service = AsyncQuoteService(db)
+            created_quote = await service.create_quote(quote)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Quote created successfully",
+            data=created_quote
+        ),
+        status_code=201
+    )
+
+
+@router.post("/bulk", response_model=BulkQuotesResponse)
+async def bulk_create_quotes(
+    request: Request,
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Rows per insert transaction"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk-create quotes from a streamed NDJSON or JSON array body.
+    Rows are validated as they arrive and inserted in chunked transactions; rejected rows are
+    reported by index without failing the rest of the request.
+    """
+    
+    service = AsyncQuoteService(db)
+    inserted = 0
+    errors: list[BulkQuoteError] = []
+    failed = 0
+    chunk: list[tuple[int, QuoteCreate]] = []
+    
+    def reject(index: int, error: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_BULK_ERRORS:
+            errors.append(BulkQuoteError(index=index, error=error))
+    
+    async def flush():
+        nonlocal inserted
+        async with bulk_writes:
+            count, rejected = await service.bulk_create_quotes(chunk)
+        inserted += count
+        for index, error in rejected:
+            reject(index, error)
+        chunk.clear()
+    
+    try:
+        async for index, record, error in iter_json_records(request.stream()):
+            if error:
+                reject(index, error)
+                continue
+            try:
+                chunk.append((index, QuoteCreate.model_validate(record)))
+            except ValidationError as e:
+                reject(index, "; ".join(err["msg"] for err in e.errors()))
+                continue
+            if len(chunk) >= chunk_size:
+                await flush()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{e} ({inserted} quotes already inserted)")
+    
+    if chunk:
+        await flush()
+    errors.sort(key=lambda e: e.index)
+    
+    return respond(
+        BulkQuotesResponse(
+            success=failed == 0,
+            message=f"Inserted {inserted} quotes, {failed} failed",
+            inserted=inserted,
+            failed=failed,
+            errors=errors
+        )
+    )
+
+
+def quote_filter(
+    category: Optional[str] = Query(None, description="Only quotes in this category"),
+    author: Optional[int] = Query(None, description="Only quotes by this author ID"),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Only these comma-separated quote ids"),
+    created_after: Optional[datetime] = Query(None, description="Only quotes created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only quotes created before this time")
+) -> QuoteFilter:
+    """Filter of a bulk update or delete; refuses an empty filter, which would match every quote"""
+    selected = QuoteFilter(
+        category=category,
+        author=author,
+        ids=parse_ids(ids) if ids else None,
+        created_after=created_after,
+        created_before=created_before
+    )
+    if selected.is_empty():
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+    return selected
+
+
+@router.patch("/", response_model=BulkChangeResponse)
+async def update_quotes(
+    quote_update: QuoteUpdate,
+    selected: QuoteFilter = Depends(quote_filter),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=10000, description="Rows per update transaction"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Apply the same update to every quote matching the filter, e.g. to rename a category.
+    Runs one set-based UPDATE per chunk of matching quotes, each committed on its own.
+    """
+    
+    if quote_update.text is None and quote_update.category is None and quote_update.author is None:
+        raise HTTPException(status_code=400, detail="No fields to update")
     
-    service = QuoteService(db)
-    created_quote = service.create_quote(quote)
+    try:
+        updated = await AsyncQuoteService(db).update_quotes(selected, quote_update, chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return QuoteResponse(
-        success=True,
-        message="Quote created successfully",
-        data=created_quote
+    return respond(
+        BulkChangeResponse(
+            success=True,
+            message=f"Updated {updated} quotes",
+            affected=updated
+        )
+    )
+
+
+@router.delete("/", response_model=BulkChangeResponse)
+async def delete_quotes(
+    selected: QuoteFilter = Depends(quote_filter),
+    chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=10000, description="Rows per delete transaction"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Delete every quote matching the filter, e.g. all quotes by a banned author.
+    Runs one set-based DELETE per chunk of matching quotes, each committed on its own.
+    """
+    
+    deleted = await AsyncQuoteService(db).delete_quotes(selected, chunk_size)
+    
+    return respond(
+        BulkChangeResponse(
+            success=True,
+            message=f"Deleted {deleted} quotes",
+            affected=deleted
+        )
     )
 
 
 @router.get("/", response_model=QuotesListResponse)
 async def get_quotes(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     category: Optional[str] = Query(None, description="Filter by category"),
     author: Optional[int] = Query(None, description="Filter by author ID"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(True, description="Include the total number of matching quotes"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated)$", description="exact or estimated total"),
+    expand: Optional[str] = Query(None, pattern=EXPAND_PATTERN, description="author to embed each quote's author"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get all quotes with pagination and filtering.
+    Pass next_cursor back as cursor to page by keyset instead of offset; totals are omitted in that mode.
+    Responds 304 when no quote (or, with expand=author, no user) has been written since the client's copy.
+    """
+    
+    service = AsyncQuoteService(db)
+    
+    version = await service.get_quotes_version()
+    users_version = await AsyncUserService(db).get_users_version() if expand else None
+    headers = validator_headers(
+        weak_etag(
+            version, users_version, category, author, page, per_page, cursor, include_total, total_mode, expand
+        ),
+        None
+    )
+    if is_not_modified(request, headers["ETag"], None):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    
+    try:
+        quotes, total, next_cursor = await service.get_quotes(
+            page, per_page, category, author, cursor, include_total, total_mode == "estimated",
+            expand == "author"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return respond(
+        QuotesListResponse(
+            success=True,
+            message=f"Retrieved {len(quotes)} quotes",
+            data=quotes,
+            total=total,
+            page=page,
+            per_page=per_page,
+            next_cursor=next_cursor
+        ),
+        response
+    )
+
+
+@router.get("/export")
+async def export_quotes(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    author: Optional[int] = Query(None, description="Filter by author ID"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Stream every quote matching the filters as NDJSON or CSV"""
+    
+    service = AsyncQuoteService(db)
+    return export_response(
+        service.stream_quotes(category, author),
+        format,
+        fields=["id", "text", "category", "author", "created_at", "updated_at"],
+        filename="quotes"
+    )
+
+
+@router.get("/search", response_model=QuoteSearchResponse)
+async def search_quotes(
+    q: str = Query(..., min_length=1, description="Words to search for in quote text"),
+    per_page: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get all quotes with pagination and filtering"""
+    """Full-text search over quote text, ranked by relevance"""
     
-    service = QuoteService(db)
-    quotes, total = service.get_quotes(page, per_page, category, author)
+    service = AsyncQuoteService(db)
+    try:
+        results, next_cursor = await service.search_quotes(q, per_page, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return QuotesListResponse(
-        success=True,
-        message=f"Retrieved {len(quotes)} quotes",
-        data=quotes,
-        total=total,
-        page=page,
-        per_page=per_page
+    return respond(
+        QuoteSearchResponse(
+            success=True,
+            message=f"Found {len(results)} quotes",
+            data=results,
+            per_page=per_page,
+            next_cursor=next_cursor
+        )
+    )
+
+
+@router.get("/changes", response_model=QuoteChangesResponse)
+async def get_quote_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="next_cursor of a previous response; omit to follow from now"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes to return"),
+    wait: float = Query(0, ge=0, le=60, description="Seconds to wait for a change when there is none yet"),
+):
+    """
+    Quote creates, updates and deletes after the cursor, oldest first, for incremental sync.
+    Pass wait to long-poll. With Accept: text/event-stream the changes are streamed as
+    Server-Sent Events instead, resuming from Last-Event-ID after a reconnect.
+    Responds 410 once the changes after the cursor have been pruned; reload and follow from now.
+    """
+    
+    streaming = EVENT_STREAM in request.headers.get("accept", "")
+    if streaming and request.headers.get("last-event-id"):
+        since = request.headers["last-event-id"]
+    
+    async with async_read_session(request) as db:
+        try:
+            position = await AsyncChangeService(db).cursor_position(since)
+        except CursorExpiredError as e:
+            raise HTTPException(status_code=410, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    if streaming:
+        return event_stream_response(position, limit)
+    
+    changes = await wait_for_changes(position, limit, wait)
+    
+    return respond(
+        QuoteChangesResponse(
+            success=True,
+            message=f"Retrieved {len(changes)} changes",
+            data=changes,
+            next_cursor=changes[-1].cursor if changes else encode_cursor(position)
+        )
+    )
+
+
+@router.get("/categories", response_model=CategoriesResponse)
+async def get_categories(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Every category in use with its quote count and newest quote time, for the category filter.
+    Responds 304 when no quote has been written since the client's copy.
+    """
+    
+    version = await AsyncQuoteService(db).get_quotes_version()
+    headers = validator_headers(weak_etag("categories", version), None)
+    if is_not_modified(request, headers["ETag"], None):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    
+    categories = await AsyncCategoryService(db).get_categories()
+    
+    return respond(
+        CategoriesResponse(
+            success=True,
+            message=f"Retrieved {len(categories)} categories",
+            data=categories
+        ),
+        response
+    )
+
+
+@router.get("/batch", response_model=QuotesBatchResponse)
+async def get_quotes_batch(
+    ids: str = Query(..., pattern=IDS_PATTERN, description="Comma-separated quote IDs"),
+    expand: Optional[str] = Query(None, pattern=EXPAND_PATTERN, description="author to embed each quote's author"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get several quotes by ID in one request; unknown IDs are listed in missing"""
+    
+    quote_ids = parse_ids(ids)
+    service = AsyncQuoteService(db)
+    quotes = await service.get_quotes_by_ids(quote_ids, expand == "author")
+    
+    found = {quote.id for quote in quotes}
+    return respond(
+        QuotesBatchResponse(
+            success=True,
+            message=f"Retrieved {len(quotes)} quotes",
+            data=quotes,
+            missing=[quote_id for quote_id in quote_ids if quote_id not in found]
+        )
+    )
+
+
+@router.get("/random", response_model=QuoteResponse)
+async def random_quote(
+    response: Response,
+    category: Optional[str] = Query(None, description="Filter by category"),
+    author: Optional[int] = Query(None, description="Filter by author ID"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a uniformly random quote, optionally filtered by category and/or author"""
+    
+    service = AsyncQuoteService(db)
+    quote = await service.random_quote(category, author)
+    
+    if not quote:
+        raise HTTPException(status_code=404, detail="No quotes found")
+    
+    response.headers["Cache-Control"] = "no-store"
+    
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Random quote retrieved successfully",
+            data=quote
+        ),
+        response
+    )
+
+
+@router.get("/daily", response_model=QuoteResponse)
+async def daily_quote(
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the quote of the day (UTC); cacheable until the day ends.
+    Uses the writer session since the first request of a day records the pick.
+    """
+    
+    now = datetime.now(timezone.utc)
+    service = AsyncQuoteService(db)
+    quote = await service.get_daily_quote(now.date())
+    
+    if not quote:
+        raise HTTPException(status_code=404, detail="No quotes found")
+    
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    response.headers["Cache-Control"] = f"public, max-age={int((midnight - now).total_seconds())}"
+    
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Quote of the day retrieved successfully",
+            data=quote
+        ),
+        response
     )
 
 
 @router.get("/{quote_id}", response_model=QuoteResponse)
-async def get_quote(quote_id: int, db: Session = Depends(get_db)):
-    """Get a specific quote by ID"""
+async def get_quote(
+    quote_id: int,
+    request: Request,
+    response: Response,
+    expand: Optional[str] = Query(None, pattern=EXPAND_PATTERN, description="author to embed the quote's author"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a specific quote by ID, answering 304 when the client's copy is current"""
     
-    service = QuoteService(db)
-    quote = service.get_quote_by_id(quote_id)
+    service = AsyncQuoteService(db)
+    quote = await service.get_quote_by_id(quote_id, expand == "author")
     
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     
-    return QuoteResponse(
-        success=True,
-        message="Quote retrieved successfully",
-        data=quote
+    last_modified = quote.updated_at
+    author_fields = None
+    if quote.author_details is not None:
+        details = quote.author_details
+        last_modified = max(last_modified, details.updated_at)
+        author_fields = (details.name, details.email, details.updated_at)
+    headers = validator_headers(
+        strong_etag(quote.id, quote.text, quote.category, quote.author, quote.updated_at, author_fields),
+        last_modified
+    )
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Quote retrieved successfully",
+            data=quote
+        ),
+        response
     )
 
 
 @router.put("/{quote_id}", response_model=QuoteResponse)
-async def update_quote(quote_id: int, quote_update: QuoteUpdate, db: Session = Depends(get_db)):
+async def update_quote(quote_id: int, quote_update: QuoteUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a specific quote"""
     
-    service = QuoteService(db)
-    updated_quote = service.update_quote(quote_id, quote_update)
+    service = AsyncQuoteService(db)
+    try:
+        updated_quote = await service.update_quote(quote_id, quote_update)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     if not updated_quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     
-    return QuoteResponse(
-        success=True,
-        message="Quote updated successfully",
-        data=updated_quote
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Quote updated successfully",
+            data=updated_quote
+        )
     )
 
 
 @router.delete("/{quote_id}", response_model=QuoteResponse)
-async def delete_quote(quote_id: int, db: Session = Depends(get_db)):
+async def delete_quote(quote_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a specific quote"""
     
-    service = QuoteService(db)
-    deleted_quote = service.delete_quote(quote_id)
+    service = AsyncQuoteService(db)
+    deleted_quote = await service.delete_quote(quote_id)
     
     if not deleted_quote:
         raise HTTPException(status_code=404, detail="Quote not found")
     
-    return QuoteResponse(
-        success=True,
-        message="Quote deleted successfully",
-        data=deleted_quote
+    return respond(
+        QuoteResponse(
+            success=True,
+            message="Quote deleted successfully",
+            data=deleted_quote
+        )
     )
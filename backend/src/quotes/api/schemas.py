@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 class UserBase(BaseModel):
@@ -49,11 +49,26 @@ class QuoteUpdate(BaseModel):
     author: Optional[int] = None
 
 
+class QuoteFilter(BaseModel):
+    """Selects the quotes a filter-based bulk update or delete applies to"""
+    category: Optional[str] = None
+    author: Optional[int] = None
+    ids: Optional[list[int]] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        """True when no criterion is set, i.e. the filter would match every quote"""
+        return all(value is None for value in self.__dict__.values())
+
+
 class Quote(QuoteBase):
     """Output model for quote responses"""
     id: int
     created_at: datetime
     updated_at: datetime
+    # The author's user record, only filled in when the request asks for expand=author
+    author_details: Optional[User] = None
 
     class Config:
         from_attributes = True
@@ -71,9 +86,89 @@ class QuotesListResponse(BaseModel):
     success: bool
     message: str
     data: list[Quote]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
+
+
+class QuotesBatchResponse(BaseModel):
+    """Response wrapper for quotes fetched by id"""
+    success: bool
+    message: str
+    data: list[Quote]
+    missing: list[int]
+
+
+class QuoteChange(BaseModel):
+    """
+    One entry of the quote change feed. quote is the quote as it is now, so it is None for
+    deletes and for quotes deleted since the change.
+    """
+    cursor: str
+    quote_id: int
+    operation: str
+    changed_at: datetime
+    quote: Optional[Quote] = None
+
+
+class QuoteChangesResponse(BaseModel):
+    """Response for the quote change feed"""
+    success: bool
+    message: str
+    data: list[QuoteChange]
+    next_cursor: str
+
+
+class CategorySummary(BaseModel):
+    """A category in use with its quote count and newest quote time"""
+    category: str
+    count: int
+    latest_created_at: Optional[datetime] = None
+
+
+class CategoriesResponse(BaseModel):
+    """Response wrapper for the category facet"""
+    success: bool
+    message: str
+    data: list[CategorySummary]
+
+
+class BulkQuoteError(BaseModel):
+    """A rejected row in a bulk request, identified by its position in the body"""
+    index: int
+    error: str
+
+
+class BulkQuotesResponse(BaseModel):
+    """Response for bulk quote ingestion"""
+    success: bool
+    message: str
+    inserted: int
+    failed: int
+    errors: list[BulkQuoteError]
+
+
+class BulkChangeResponse(BaseModel):
+    """Response for filter-based bulk updates and deletes"""
+    success: bool
+    message: str
+    affected: int
+
+
+class QuoteSearchResult(Quote):
+    """Quote matched by full-text search, with its BM25 rank and highlighted text"""
+    rank: float
+    highlight: str
+
+
+class QuoteSearchResponse(BaseModel):
+    """Response wrapper for full-text search results"""
+    success: bool
+    message: str
+    data: list[QuoteSearchResult]
+    per_page: int
+    next_cursor: Optional[str] = None
 
 
 class UserResponse(BaseModel):
@@ -88,11 +183,53 @@ class UsersListResponse(BaseModel):
     success: bool
     message: str
     data: list[User]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
 
 
+class UserSearchResponse(BaseModel):
+    """Response wrapper for user autocomplete results"""
+    success: bool
+    message: str
+    data: list[User]
+
+
+class UsersBatchResponse(BaseModel):
+    """Response wrapper for users fetched by id"""
+    success: bool
+    message: str
+    data: list[User]
+    missing: list[int]
+
+
+class UserDeletion(BaseModel):
+    """Progress of a background cascade delete of a user and their quotes"""
+    id: int
+    user_id: int
+    status: str
+    quotes_total: int
+    quotes_deleted: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+class UserDeletionResponse(BaseModel):
+    """Response for user deletion job operations"""
+    success: bool
+    message: str
+    data: UserDeletion
+
+
+class QueryDiagnosticsSettings(BaseModel):
+    """Runtime settings for the slow-query log and N+1 detection"""
+    enabled: bool
+    slow_query_ms: float = Field(100, ge=0)
+    n_plus_one_threshold: int = Field(5, ge=2)
+
+
 class HealthCheckResponse(BaseModel):
     """Health check response model"""
     status: str
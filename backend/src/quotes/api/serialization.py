@@ -0,0 +1,82 @@
+"""
+Fast JSON rendering for trusted response envelopes.
+
+By default FastAPI dumps the returned model, validates it again against response_model and
+serializes the result. Envelopes built by the service layer from ORM rows are already valid,
+so routers that opt in return them as TrustedJSONResponse instead: pydantic-core writes the
+whole envelope straight to JSON bytes in one pass and response_model is left to the docs.
+"""
+import os
+from functools import lru_cache
+from typing import Any, Optional, TypeVar
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_object_setattr = object.__setattr__
+
+# Comma-separated router names (e.g. "quotes,users") that render through the fast path
+FAST_SERIALIZATION_ROUTERS = {
+    name.strip()
+    for name in os.getenv("QUOTES_FAST_SERIALIZATION_ROUTERS", "").split(",")
+    if name.strip()
+}
+
+
+def trusted_construct(model: type[ModelT], values: dict[str, Any]) -> ModelT:
+    """
+    Build a model from values already known to be valid, such as columns of an ORM row.
+    Like BaseModel.model_construct but without its per-field alias and default handling,
+    so values must supply every field.
+
+    The services use it whether or not a router renders through the fast path: with the
+    fast path off, FastAPI still validates the returned envelope against response_model, so
+    skipping validation here only drops a second, redundant pass over the same row.
+    """
+    instance = model.__new__(model)
+    _object_setattr(instance, "__dict__", values)
+    _object_setattr(instance, "__pydantic_fields_set__", set(values))
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter for a type, built once per process"""
+    return TypeAdapter(tp)
+
+
+class TrustedJSONResponse(Response):
+    """JSON response that serializes its content without validating it first"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return type_adapter(type(content)).dump_json(content)
+
+
+class ResponseRenderer:
+    """Per-router switch between FastAPI's response_model handling and TrustedJSONResponse"""
+
+    def __init__(self, router_name: str):
+        self.enabled = router_name in FAST_SERIALIZATION_ROUTERS
+
+    def __call__(
+        self,
+        envelope: BaseModel,
+        response: Optional[Response] = None,
+        status_code: int = 200
+    ) -> Any:
+        """
+        Return the envelope for the route to hand back. With the fast path on, headers already
+        set on the injected response are carried over, since FastAPI does not merge them into
+        a returned Response.
+        """
+        if not self.enabled:
+            return envelope
+
+        headers = dict(response.headers) if response is not None else None
+        return TrustedJSONResponse(envelope, status_code=status_code, headers=headers)
@@ -0,0 +1,138 @@
+"""
+Incremental parsing of streamed request bodies.
+Accepts either NDJSON (one JSON value per line) or a single top-level JSON array,
+and yields records as soon as they are complete so the body is never held in memory.
+At most one record is buffered, and a record longer than MAX_RECORD_CHARS is rejected.
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Optional
+
+_decoder = json.JSONDecoder()
+
+# Longest a single record may grow while it is buffered
+MAX_RECORD_CHARS = 1024 * 1024
+
+# A decode error this close to the end of the buffer may just be a token cut off by the chunk
+# boundary (a literal such as -Infinity, a number or a \uXXXX escape)
+_TRUNCATION_SLACK = len("-Infinity")
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes]
+) -> AsyncIterator[tuple[int, Any, Optional[str]]]:
+    """
+    Yield (index, record, error) for every record in a streamed NDJSON or JSON array body.
+    A malformed or oversized NDJSON line is reported through error and parsing carries on with
+    the next line; a malformed or oversized JSON array element cannot be resynchronised and
+    raises ValueError as soon as it is detected, without reading the rest of the body.
+    """
+    iterator = _decode(chunks).__aiter__()
+    buffer = ""
+
+    # Sniff the format from the first non-whitespace character
+    async for chunk in iterator:
+        buffer += chunk
+        if buffer.strip():
+            break
+
+    buffer = buffer.lstrip()
+    if buffer.startswith("["):
+        records = _iter_array(iterator, buffer[1:])
+    else:
+        records = _iter_lines(iterator, buffer)
+
+    async for item in records:
+        yield item
+
+
+async def _decode(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Incremental decoding keeps multi-byte characters split across chunks intact
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+async def _iter_lines(iterator: AsyncIterator[str], buffer: str):
+    index = 0
+    # Set while skipping the rest of a line that outgrew MAX_RECORD_CHARS
+    oversized = False
+    too_long = f"Line exceeds {MAX_RECORD_CHARS} characters"
+
+    def parse(line: str):
+        try:
+            return json.loads(line), None
+        except ValueError as e:
+            return None, f"Invalid JSON: {e}"
+
+    while True:
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if oversized:
+                yield index, None, too_long
+                index += 1
+                oversized = False
+            elif line.strip():
+                record, error = parse(line)
+                yield index, record, error
+                index += 1
+
+        if len(buffer) > MAX_RECORD_CHARS:
+            oversized = True
+            buffer = ""
+
+        chunk = await anext(iterator, None)
+        if chunk is None:
+            break
+        buffer += chunk
+
+    if oversized:
+        yield index, None, too_long
+    elif buffer.strip():
+        record, error = parse(buffer)
+        yield index, record, error
+
+
+async def _iter_array(iterator: AsyncIterator[str], buffer: str):
+    index = 0
+    position = 0
+    exhausted = False
+
+    while True:
+        # Skip separators between elements
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+
+        if position < len(buffer) and buffer[position] == "]":
+            return
+
+        try:
+            record, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            # Incomplete element: wait for more of the body, unless there is none left or more
+            # of it could not make the element valid
+            if exhausted or not _may_be_truncated(e, len(buffer)):
+                raise ValueError(f"Invalid JSON array at element {index}: {e.msg}")
+            if len(buffer) - position > MAX_RECORD_CHARS:
+                raise ValueError(f"JSON array element {index} exceeds {MAX_RECORD_CHARS} characters")
+            chunk = await anext(iterator, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer = buffer[position:] + chunk
+                position = 0
+            continue
+
+        yield index, record, None
+        index += 1
+        position = end
+
+
+def _may_be_truncated(error: json.JSONDecodeError, length: int) -> bool:
+    """Whether a decode error could go away once the rest of the element arrives"""
+    return error.msg.startswith("Unterminated string") or error.pos >= length - _TRUNCATION_SLACK
@@ -1,111 +1,271 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
-from src.quotes.core.database import get_db
-from src.quotes.services.users import UserService
-from src.quotes.api.schemas import UserCreate, UserUpdate, UserResponse, UsersListResponse
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.core.database import get_async_db, get_async_read_db
+from src.quotes.services.users import AsyncUserService
+from src.quotes.services.user_deletions import AsyncUserDeletionService, user_deletions
+from src.quotes.api.schemas import (
+    UserCreate, UserUpdate, UserResponse, UsersListResponse, UsersBatchResponse, UserSearchResponse,
+    UserDeletionResponse
+)
+from src.quotes.api.batch import parse_ids, IDS_PATTERN
+from src.quotes.api.export import export_response, EXPORT_FORMAT_PATTERN
+from src.quotes.api.conditional import (
+    strong_etag, weak_etag, validator_headers, is_not_modified, not_modified_response
+)
+from src.quotes.api.serialization import ResponseRenderer
 
 router = APIRouter(prefix="/users", tags=["users"])
+respond = ResponseRenderer("users")
 
 
 @router.post("/", response_model=UserResponse, status_code=201)
-async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new user"""
     
-    service = UserService(db)
+    service = AsyncUserService(db)
     
     # Check if user with email already exists
-    existing_user = service.get_user_by_email(user.email)
+    existing_user = await service.get_user_by_email(user.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="User with this email already exists")
     
-    created_user = service.create_user(user)
+    created_user = await service.create_user(user)
     
-    return UserResponse(
-        success=True,
-        message="User created successfully",
-        data=created_user
+    return respond(
+        UserResponse(
+            success=True,
+            message="User created successfully",
+            data=created_user
+        ),
+        status_code=201
     )
 
 
 @router.get("/", response_model=UsersListResponse)
 async def get_users(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(10, ge=1, le=100, description="Items per page"),
     name: Optional[str] = Query(None, description="Filter by name"),
     email: Optional[str] = Query(None, description="Filter by email"),
-    db: Session = Depends(get_db)
+    include_total: bool = Query(True, description="Include the total number of matching users"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
-    """Get all users with pagination and filtering"""
-    
-    service = UserService(db)
-    users, total = service.get_users(page, per_page, name, email)
-    
-    return UsersListResponse(
-        success=True,
-        message=f"Retrieved {len(users)} users",
-        data=users,
-        total=total,
-        page=page,
-        per_page=per_page
+    """Get all users with pagination and filtering, answering 304 when no user has been written since"""
+    
+    service = AsyncUserService(db)
+    
+    version = await service.get_users_version()
+    headers = validator_headers(
+        weak_etag(version, name, email, page, per_page, include_total),
+        None
+    )
+    if is_not_modified(request, headers["ETag"], None):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    
+    users, total = await service.get_users(page, per_page, name, email, include_total)
+    
+    return respond(
+        UsersListResponse(
+            success=True,
+            message=f"Retrieved {len(users)} users",
+            data=users,
+            total=total,
+            page=page,
+            per_page=per_page
+        ),
+        response
+    )
+
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern=EXPORT_FORMAT_PATTERN, description="ndjson or csv"),
+    name: Optional[str] = Query(None, description="Filter by name"),
+    email: Optional[str] = Query(None, description="Filter by email"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Stream every user matching the filters as NDJSON or CSV"""
+    
+    service = AsyncUserService(db)
+    return export_response(
+        service.stream_users(name, email),
+        format,
+        fields=["id", "name", "email", "created_at", "updated_at"],
+        filename="users"
+    )
+
+
+@router.get("/search", response_model=UserSearchResponse)
+async def search_users(
+    prefix: str = Query(..., min_length=1, max_length=100, description="Start of a word in the name or email"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of users to return"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Autocomplete users by name or email prefix through the full-text index"""
+    
+    service = AsyncUserService(db)
+    try:
+        users = await service.search_users(prefix, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return respond(
+        UserSearchResponse(
+            success=True,
+            message=f"Found {len(users)} users",
+            data=users
+        )
+    )
+
+
+@router.get("/batch", response_model=UsersBatchResponse)
+async def get_users_batch(
+    ids: str = Query(..., pattern=IDS_PATTERN, description="Comma-separated user IDs"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get several users by ID in one request; unknown IDs are listed in missing"""
+    
+    user_ids = parse_ids(ids)
+    service = AsyncUserService(db)
+    users = await service.get_users_by_ids(user_ids)
+    
+    found = {user.id for user in users}
+    return respond(
+        UsersBatchResponse(
+            success=True,
+            message=f"Retrieved {len(users)} users",
+            data=users,
+            missing=[user_id for user_id in user_ids if user_id not in found]
+        )
+    )
+
+
+@router.get("/deletions/{deletion_id}", response_model=UserDeletionResponse)
+async def get_user_deletion(deletion_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Status and progress of a cascade delete"""
+    
+    deletion = await AsyncUserDeletionService(db).get_deletion(deletion_id)
+    if not deletion:
+        raise HTTPException(status_code=404, detail="Deletion not found")
+    
+    return respond(
+        UserDeletionResponse(
+            success=True,
+            message=f"Deletion is {deletion.status}",
+            data=deletion
+        )
     )
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
-    """Get a specific user by ID"""
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get a specific user by ID, answering 304 when the client's copy is current"""
     
-    service = UserService(db)
-    user = service.get_user_by_id(user_id)
+    service = AsyncUserService(db)
+    user = await service.get_user_by_id(user_id)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse(
-        success=True,
-        message="User retrieved successfully",
-        data=user
+    headers = validator_headers(
+        strong_etag(user.id, user.name, user.email, user.updated_at),
+        user.updated_at
+    )
+    if is_not_modified(request, headers["ETag"], user.updated_at):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+    
+    return respond(
+        UserResponse(
+            success=True,
+            message="User retrieved successfully",
+            data=user
+        ),
+        response
     )
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(user_id: int, user_update: UserUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update a specific user"""
     
-    service = UserService(db)
+    service = AsyncUserService(db)
     
     # Check if user exists
-    existing_user = service.get_user_by_id(user_id)
+    existing_user = await service.get_user_by_id(user_id)
     if not existing_user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Check if email is being updated and if it already exists
     if user_update.email:
-        user_with_email = service.get_user_by_email(user_update.email)
+        user_with_email = await service.get_user_by_email(user_update.email)
         if user_with_email and user_with_email.id != user_id:
             raise HTTPException(status_code=400, detail="User with this email already exists")
     
-    updated_user = service.update_user(user_id, user_update)
+    updated_user = await service.update_user(user_id, user_update)
     
-    return UserResponse(
-        success=True,
-        message="User updated successfully",
-        data=updated_user
+    return respond(
+        UserResponse(
+            success=True,
+            message="User updated successfully",
+            data=updated_user
+        )
     )
 
 
-@router.delete("/{user_id}", response_model=UserResponse)
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
-    """Delete a specific user"""
+@router.delete(
+    "/{user_id}",
+    response_model=Union[UserResponse, UserDeletionResponse],
+    responses={202: {"model": UserDeletionResponse, "description": "Deletion of the user and their quotes started"}}
+)
+async def delete_user(user_id: int, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Delete a specific user. A user without quotes is deleted at once and returned.
+    A user with quotes is hidden immediately and 202 returns a deletion job: the quotes are
+    removed in the background in short chunked transactions, then the user row itself. Poll
+    the job at Location for progress; repeating the DELETE meanwhile returns the same job.
+    """
     
-    service = UserService(db)
-    deleted_user = service.delete_user(user_id)
+    deletions = AsyncUserDeletionService(db)
+    try:
+        deleted_user = await AsyncUserService(db).delete_user(user_id)
+    except ValueError:
+        # The user still has quotes, which are removed by a background cascade delete
+        deletion = await deletions.start_deletion(user_id)
+        if deletion:
+            user_deletions.schedule(deletion)
+    else:
+        if deleted_user:
+            return respond(
+                UserResponse(
+                    success=True,
+                    message="User deleted successfully",
+                    data=deleted_user
+                )
+            )
+        # Unknown, or hidden while an earlier DELETE is still removing their quotes
+        deletion = await deletions.active_deletion(user_id)
     
-    if not deleted_user:
+    if not deletion:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse(
-        success=True,
-        message="User deleted successfully",
-        data=deleted_user
+    response.status_code = 202
+    response.headers["Location"] = f"{router.prefix}/deletions/{deletion.id}"
+    return respond(
+        UserDeletionResponse(
+            success=True,
+            message=f"User deletion is {deletion.status}",
+            data=deletion
+        ),
+        response,
+        status_code=202
     )
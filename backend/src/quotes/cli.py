@@ -0,0 +1,60 @@
+"""
+Maintenance commands.
+Run from the backend directory, e.g. `python -m src.quotes.cli rebuild-counters`.
+"""
+import argparse
+from src.quotes.core.config import CHANGE_LOG_RETENTION_DAYS
+from src.quotes.core.database import SessionLocal
+from src.quotes.services.cache_sync import CacheSyncService
+from src.quotes.services.changes import ChangeService
+from src.quotes.services.counters import CounterService
+from src.quotes.services.categories import CategoryService
+
+
+def rebuild_counters() -> None:
+    """Recompute the maintained quote and user totals"""
+    db = SessionLocal()
+    try:
+        CounterService(db).rebuild()
+    finally:
+        db.close()
+    print("Counters rebuilt")
+
+
+def rebuild_categories() -> None:
+    """Recompute the category summary behind GET /quotes/categories"""
+    db = SessionLocal()
+    try:
+        CategoryService(db).rebuild()
+    finally:
+        db.close()
+    print("Category summary rebuilt")
+
+
+def prune_changes() -> None:
+    """Drop quote and user change log entries older than the retention period"""
+    db = SessionLocal()
+    try:
+        deleted = ChangeService(db).prune(CHANGE_LOG_RETENTION_DAYS)
+        deleted += CacheSyncService(db).prune(CHANGE_LOG_RETENTION_DAYS)
+    finally:
+        db.close()
+    print(f"Pruned {deleted} changes older than {CHANGE_LOG_RETENTION_DAYS:g} days")
+
+
+COMMANDS = {
+    "rebuild-counters": rebuild_counters,
+    "rebuild-categories": rebuild_categories,
+    "prune-changes": prune_changes,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Quotes API maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
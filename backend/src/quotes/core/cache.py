@@ -0,0 +1,95 @@
+"""
+In-process read-through caches for hot single-entity reads.
+Entries expire after a TTL and the least recently used entry is evicted once the cache is full;
+the service layer invalidates entries precisely on update and delete.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss/eviction counters"""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Current size and counters"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Cache sizes and TTLs are configurable per entity; a size of 0 disables the cache
+quote_cache = LRUCache(
+    "quotes",
+    maxsize=int(os.getenv("QUOTES_QUOTE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("QUOTES_QUOTE_CACHE_TTL", "300")),
+)
+
+user_cache = LRUCache(
+    "users",
+    maxsize=int(os.getenv("QUOTES_USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("QUOTES_USER_CACHE_TTL", "300")),
+)
+
+
+def cache_stats() -> dict:
+    """Stats for every entity cache, keyed by name"""
+    return {cache.name: cache.stats() for cache in (quote_cache, user_cache)}
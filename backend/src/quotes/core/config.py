@@ -0,0 +1,115 @@
+"""
+Environment-driven settings for the database engines.
+A named profile supplies SQLite pragmas and pool sizing; individual QUOTES_DB_* variables
+override single values of the chosen profile.
+"""
+import os
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    """SQLite pragmas and connection pool parameters applied to every engine"""
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    cache_size: int
+    busy_timeout: int
+    foreign_keys: bool
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+
+
+# Both profiles enforce foreign keys: a quote's author must exist, so a user with quotes is never
+# deleted outright; DELETE /users/{id} hides them and removes their quotes in the background
+# first. QUOTES_DB_FOREIGN_KEYS=off drops the check, and quotes of deleted users are orphaned.
+PROFILES = {
+    # Every commit is fsynced; WAL still lets readers run alongside the single writer
+    "durable": EngineProfile(
+        journal_mode="WAL",
+        synchronous="FULL",
+        mmap_size=0,
+        cache_size=-16000,
+        busy_timeout=5000,
+        foreign_keys=True,
+        pool_size=5,
+        max_overflow=10,
+        pool_timeout=30.0,
+    ),
+    # WAL with synchronous=NORMAL only fsyncs at checkpoints: a power loss can drop the last
+    # commits but never corrupts the database. Larger page cache and memory-mapped reads.
+    "throughput": EngineProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,
+        busy_timeout=5000,
+        foreign_keys=True,
+        pool_size=10,
+        max_overflow=20,
+        pool_timeout=30.0,
+    ),
+}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_profile() -> EngineProfile:
+    """The profile named by QUOTES_DB_PROFILE with any QUOTES_DB_* overrides applied"""
+    name = os.getenv("QUOTES_DB_PROFILE", "durable")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown database profile {name!r}, expected one of {sorted(PROFILES)}")
+
+    profile = PROFILES[name]
+    return replace(
+        profile,
+        journal_mode=os.getenv("QUOTES_DB_JOURNAL_MODE", profile.journal_mode),
+        synchronous=os.getenv("QUOTES_DB_SYNCHRONOUS", profile.synchronous),
+        mmap_size=int(os.getenv("QUOTES_DB_MMAP_SIZE", profile.mmap_size)),
+        cache_size=int(os.getenv("QUOTES_DB_CACHE_SIZE", profile.cache_size)),
+        busy_timeout=int(os.getenv("QUOTES_DB_BUSY_TIMEOUT", profile.busy_timeout)),
+        foreign_keys=_env_bool("QUOTES_DB_FOREIGN_KEYS", profile.foreign_keys),
+        pool_size=int(os.getenv("QUOTES_DB_POOL_SIZE", profile.pool_size)),
+        max_overflow=int(os.getenv("QUOTES_DB_MAX_OVERFLOW", profile.max_overflow)),
+        pool_timeout=float(os.getenv("QUOTES_DB_POOL_TIMEOUT", profile.pool_timeout)),
+    )
+
+
+# Path of the SQLite database file, relative to the working directory
+DATABASE_PATH = os.getenv("QUOTES_DATABASE_PATH", "quotes.db")
+
+# Optional URL of a read replica (async driver) for GET routes; defaults to a read-only
+# connection pool on DATABASE_PATH
+DATABASE_READ_URL = os.getenv("QUOTES_DATABASE_READ_URL")
+
+# After a client's successful write, its reads are served by the writer for this many seconds
+# (tracked with a cookie) so a lagging replica cannot hide its own writes; 0 disables it
+READ_YOUR_WRITES_SECONDS = float(os.getenv("QUOTES_READ_YOUR_WRITES_SECONDS", "0"))
+
+# Group commit for POST /quotes: concurrent creates are queued and written in one transaction.
+# A batch starts as soon as the writer is free and waits at most the window for more rows.
+WRITE_COALESCING = _env_bool("QUOTES_WRITE_COALESCING", True)
+WRITE_COALESCE_WINDOW_MS = float(os.getenv("QUOTES_WRITE_COALESCE_WINDOW_MS", "2"))
+WRITE_COALESCE_MAX_BATCH = int(os.getenv("QUOTES_WRITE_COALESCE_MAX_BATCH", "100"))
+
+# Cascade deletes of users remove their quotes in chunks of this many rows, each in its own
+# short transaction, pausing between chunks so other writers get the write lock
+USER_DELETE_CHUNK_SIZE = int(os.getenv("QUOTES_USER_DELETE_CHUNK_SIZE", "500"))
+USER_DELETE_PAUSE_MS = float(os.getenv("QUOTES_USER_DELETE_PAUSE_MS", "10"))
+
+# Change feed: how often waiting long-poll and SSE clients are checked for new changes (one
+# query per interval for all of them), how many days of changes are kept, and how often the
+# app prunes older ones (at startup, then every interval; 0 leaves it to `prune-changes`)
+CHANGE_FEED_POLL_MS = float(os.getenv("QUOTES_CHANGE_FEED_POLL_MS", "250"))
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv("QUOTES_CHANGE_LOG_RETENTION_DAYS", "7"))
+CHANGE_LOG_PRUNE_MINUTES = float(os.getenv("QUOTES_CHANGE_LOG_PRUNE_MINUTES", "60"))
+
+# Cross-process cache coherence: how often each worker reads the quote and user change logs to
+# drop cache entries other workers' writes made stale. 0 turns it off for single-process runs.
+CACHE_SYNC_MS = float(os.getenv("QUOTES_CACHE_SYNC_MS", "100"))
@@ -1,28 +1,153 @@
 """
 Database configuration and session management.
 """
-from sqlalchemy import create_engine
+from math import ceil
+from typing import Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
+from src.quotes.core.config import (
+    DATABASE_PATH, DATABASE_READ_URL, READ_YOUR_WRITES_SECONDS, EngineProfile, load_profile
+)
 
 # SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///quotes.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+# Same database through the aiosqlite driver, used by the API routes
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Read-only connections for GET routes, unless a replica is configured
+ASYNC_SQLALCHEMY_READ_DATABASE_URL = (
+    DATABASE_READ_URL or f"sqlite+aiosqlite:///file:{DATABASE_PATH}?mode=ro&uri=true"
 )
 
+# Pragmas and pool sizing, chosen by QUOTES_DB_PROFILE
+profile = load_profile()
+
+
+def _apply_pragmas(engine: Engine, profile: EngineProfile, read_only: bool = False) -> None:
+    """Run the profile's pragmas on every new DBAPI connection of the engine"""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if read_only:
+            # The journal mode is a property of the file and can only be set by a writer
+            cursor.execute("PRAGMA query_only=ON")
+        else:
+            cursor.execute(f"PRAGMA journal_mode={profile.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={profile.synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={profile.mmap_size}")
+        cursor.execute(f"PRAGMA cache_size={profile.cache_size}")
+        cursor.execute(f"PRAGMA busy_timeout={profile.busy_timeout}")
+        cursor.execute(f"PRAGMA foreign_keys={'ON' if profile.foreign_keys else 'OFF'}")
+        cursor.close()
+
+
+def create_db_engine(url: str, profile: EngineProfile, read_only: bool = False) -> Engine:
+    """Create a sync engine configured by the given profile"""
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout
+    )
+    _apply_pragmas(engine, profile, read_only)
+    return engine
+
+
+def create_async_db_engine(url: str, profile: EngineProfile, read_only: bool = False) -> AsyncEngine:
+    """Create an async engine configured by the given profile"""
+    engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+        pool_timeout=profile.pool_timeout
+    )
+    _apply_pragmas(engine.sync_engine, profile, read_only)
+    return engine
+
+
+# Create SQLAlchemy engine
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, profile)
+
+
+class WriterSession(Session):
+    """Session class of the writer pools, so listeners can react to commits of writes"""
+
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=WriterSession)
+
+# Async engine and sessions for request handlers; the sync engine above stays for Alembic and SQLAdmin
+async_engine = create_async_db_engine(ASYNC_SQLALCHEMY_DATABASE_URL, profile)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=WriterSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Separate read-only pool, so long reads never hold connections writers are waiting for
+async_read_engine = create_async_db_engine(ASYNC_SQLALCHEMY_READ_DATABASE_URL, profile, read_only=True)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Set on the response to a client's successful write while read-your-writes is on; that
+# client's reads go to the writer until the cookie expires
+READ_YOUR_WRITES_COOKIE = "quotes_recent_write"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def reads_go_to_writer(request: Optional[Request]) -> bool:
+    """True while the client wrote recently enough that the readers may not show it yet"""
+    return READ_YOUR_WRITES_SECONDS > 0 and request is not None and READ_YOUR_WRITES_COOKIE in request.cookies
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware marking a client whose write succeeded for READ_YOUR_WRITES_SECONDS"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS or READ_YOUR_WRITES_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={ceil(READ_YOUR_WRITES_SECONDS)}; "
+            f"Path=/; HttpOnly; SameSite=Lax"
+        )
+
+        async def send_marked(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_marked)
+
 
 # Create Base class for models
 Base = declarative_base()
 
 
 def get_db():
+    """Writer session, for mutations"""
     db = SessionLocal()
     try:
         yield db
@@ -30,6 +155,27 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Async writer session, for mutations"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def async_read_session(request: Optional[Request] = None) -> AsyncSession:
+    """
+    New async read-only session, for reads made outside a request's dependencies; given the
+    request, a client that wrote recently reads from the writer instead.
+    """
+    session_factory = AsyncSessionLocal if reads_go_to_writer(request) else AsyncReadSessionLocal
+    return session_factory()
+
+
+async def get_async_read_db(request: Request):
+    """Async read-only session, for queries"""
+    async with async_read_session(request) as db:
+        yield db
+
+
 def create_tables():
     """
     Create all tables in the database.
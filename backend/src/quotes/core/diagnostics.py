@@ -0,0 +1,200 @@
+"""
+Query diagnostics on top of the engine events.
+Logs statements slower than a threshold together with their bound parameters and
+EXPLAIN QUERY PLAN (flagging full table scans), and reports statement shapes repeated within
+one request (N+1). Off by default; settings can be changed at runtime through the API.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("quotes.queries")
+
+# Reports kept for GET /diagnostics/queries
+RECENT_REPORTS = 50
+
+# Longest rendering of bound parameters written to a report
+MAX_PARAMETERS_LENGTH = 500
+
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+_COUNTED_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+
+@dataclass
+class DiagnosticsSettings:
+    """Runtime switches for query diagnostics"""
+    enabled: bool
+    # Statements slower than this are logged with their query plan
+    slow_query_ms: float
+    # A statement shape run this many times in one request is reported as N+1
+    n_plus_one_threshold: int
+
+
+# Initial values come from the environment; PUT /diagnostics/queries changes them at runtime
+settings = DiagnosticsSettings(
+    enabled=os.getenv("QUOTES_QUERY_DIAGNOSTICS", "").strip().lower() in ("1", "true", "yes", "on"),
+    slow_query_ms=float(os.getenv("QUOTES_SLOW_QUERY_MS", "100")),
+    n_plus_one_threshold=int(os.getenv("QUOTES_N_PLUS_ONE_THRESHOLD", "5")),
+)
+
+_recent_slow: deque = deque(maxlen=RECENT_REPORTS)
+_recent_n_plus_one: deque = deque(maxlen=RECENT_REPORTS)
+_recent_lock = threading.Lock()
+
+
+def configure(enabled: bool, slow_query_ms: float, n_plus_one_threshold: int) -> DiagnosticsSettings:
+    """Replace the runtime settings; takes effect for the next statement"""
+    settings.enabled = enabled
+    settings.slow_query_ms = slow_query_ms
+    settings.n_plus_one_threshold = n_plus_one_threshold
+    return settings
+
+
+def report() -> dict:
+    """Current settings and the most recent slow query and N+1 reports"""
+    with _recent_lock:
+        return {
+            "settings": asdict(settings),
+            "slow_queries": list(_recent_slow),
+            "n_plus_one": list(_recent_n_plus_one),
+        }
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with IN lists of any length collapsed, so repeats compare equal"""
+    return _IN_LIST.sub("IN (?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """Tables read by a full scan according to EXPLAIN QUERY PLAN details"""
+    return [match.group(1) for detail in plan if (match := _FULL_SCAN.match(detail))]
+
+
+@dataclass
+class RequestQueries:
+    """Statement shapes run on behalf of one request"""
+    shapes: dict[str, int] = field(default_factory=dict)
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+def _explain(conn, statement: str, parameters) -> list[str]:
+    conn.info["explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row[3] for row in rows]
+    except Exception as e:
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        conn.info["explaining"] = False
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.enabled:
+        conn.info.setdefault("diagnostics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("diagnostics_started")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    if conn.info.get("explaining"):
+        return
+
+    if statement.lstrip()[:6].upper() not in _COUNTED_VERBS:
+        return
+
+    queries = current_queries.get()
+    if queries is not None:
+        shape = statement_shape(statement)
+        queries.shapes[shape] = queries.shapes.get(shape, 0) + 1
+
+    if elapsed_ms < settings.slow_query_ms:
+        return
+
+    plan = [] if executemany else _explain(conn, statement, parameters)
+    scans = full_scans(plan)
+    entry = {
+        "at": time.time(),
+        "duration_ms": round(elapsed_ms, 3),
+        "statement": statement_shape(statement),
+        "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+        "plan": plan,
+        "full_scans": scans,
+    }
+    with _recent_lock:
+        _recent_slow.append(entry)
+    logger.warning(
+        "Slow query (%.1f ms)%s: %s params=%s plan=%s",
+        elapsed_ms,
+        f" FULL SCAN of {', '.join(scans)}" if scans else "",
+        entry["statement"],
+        entry["parameters"],
+        " | ".join(plan),
+    )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    conn = context.connection
+    if conn is not None and conn.info.get("diagnostics_started"):
+        conn.info["diagnostics_started"].pop()
+
+
+class QueryDiagnosticsMiddleware:
+    """
+    Pure ASGI middleware collecting statement shapes per request while diagnostics are on,
+    and reporting shapes repeated at least n_plus_one_threshold times once the request ends.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_queries.reset(token)
+            self._report(scope, queries)
+
+    @staticmethod
+    def _report(scope, queries: RequestQueries) -> None:
+        repeated = {
+            shape: count
+            for shape, count in queries.shapes.items()
+            if count >= settings.n_plus_one_threshold
+        }
+        if not repeated:
+            return
+
+        route = getattr(scope.get("route"), "path", scope["path"])
+        entry = {
+            "at": time.time(),
+            "request": f"{scope['method']} {scope['path']}",
+            "route": route,
+            "repeated": [{"statement": shape, "count": count} for shape, count in repeated.items()],
+        }
+        with _recent_lock:
+            _recent_n_plus_one.append(entry)
+        for shape, count in repeated.items():
+            logger.warning("Possible N+1 in %s %s: %d x %s", scope["method"], route, count, shape)
@@ -0,0 +1,121 @@
+"""
+Compact in-memory index of quote ids for O(1) random picks.
+Ids are kept in typed arrays (8 bytes per id) per filter: all quotes, per category and per author.
+"""
+import random
+import threading
+from array import array
+from typing import Callable, Iterable, Optional
+
+IndexKey = tuple
+
+
+def index_keys(category: Optional[str], author: Optional[int]) -> list[IndexKey]:
+    """Every index list a quote with this category and author belongs to"""
+    keys: list[IndexKey] = [("all",), ("author", author)]
+    if category:
+        keys.append(("category", category))
+    return keys
+
+
+class RandomIdIndex:
+    """
+    Array-backed id lists for uniform random picks.
+    Lists load lazily from the database, absorb this process's inserts, and count deletions as
+    stale instead of searching the array; callers skip stale picks, and a list is dropped for a
+    fresh load once a quarter of it is stale.
+    With several worker processes the lists follow the shared quote change log instead (see
+    follow_log), so inserts made by any process are absorbed exactly once.
+    """
+
+    def __init__(self):
+        self._lists: dict[IndexKey, array] = {}
+        self._stale: dict[IndexKey, int] = {}
+        self._following = False
+        self._lock = threading.Lock()
+
+    def pick(self, key: IndexKey, load: Callable[[], Iterable[int]]) -> Optional[int]:
+        """A uniformly random id from the list for key, loading it first if needed"""
+        with self._lock:
+            ids = self._lists.get(key)
+
+        if ids is None:
+            ids = array("q", load())
+            with self._lock:
+                self._lists[key] = ids
+                self._stale[key] = 0
+
+        if not ids:
+            return None
+        return ids[random.randrange(len(ids))]
+
+    def add(self, quote_id: int, category: Optional[str], author: int) -> None:
+        """Record a newly created quote in every loaded list it belongs to"""
+        if self._following:
+            return
+        with self._lock:
+            for key in index_keys(category, author):
+                ids = self._lists.get(key)
+                if ids is not None:
+                    ids.append(quote_id)
+
+    def remove(self, quote_id: int, category: Optional[str], author: int) -> None:
+        """Record that a quote left the lists it belonged to"""
+        if self._following:
+            return
+        with self._lock:
+            for key in index_keys(category, author):
+                self._count_stale(key)
+
+    def follow_log(self, following: bool) -> None:
+        """
+        While following, add and remove are ignored and the lists change only through
+        apply_change, fed from the change log that records the writes of every process
+        """
+        self._following = following
+
+    def apply_change(self, quote_id: int, operation: str, category: Optional[str], author: Optional[int]) -> None:
+        """Apply one change log entry, with the quote's current category and author (None once deleted)"""
+        with self._lock:
+            if operation == "create":
+                if author is None:
+                    return
+                for key in index_keys(category, author):
+                    ids = self._lists.get(key)
+                    # Lists load in id order and creates arrive in commit order, so an id not
+                    # above the last one was already loaded
+                    if ids is not None and (not ids or ids[-1] < quote_id):
+                        ids.append(quote_id)
+            elif operation == "delete":
+                # The deleted quote's category and author are gone; only the all list is known to hold it
+                self._count_stale(("all",))
+            elif author is not None:
+                # The update may have moved the quote into these lists
+                for key in index_keys(category, author)[1:]:
+                    self._drop(key)
+
+    def invalidate(self, key: IndexKey) -> None:
+        """Drop a list so the next pick reloads it"""
+        with self._lock:
+            self._drop(key)
+
+    def clear(self) -> None:
+        """Drop every list"""
+        with self._lock:
+            self._lists.clear()
+            self._stale.clear()
+
+    def _count_stale(self, key: IndexKey) -> None:
+        ids = self._lists.get(key)
+        if ids is None:
+            return
+        self._stale[key] += 1
+        if self._stale[key] * 4 > len(ids):
+            self._drop(key)
+
+    def _drop(self, key: IndexKey) -> None:
+        self._lists.pop(key, None)
+        self._stale.pop(key, None)
+
+
+quote_ids = RandomIdIndex()
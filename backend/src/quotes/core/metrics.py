@@ -0,0 +1,294 @@
+"""
+Request and database instrumentation with a Prometheus text exposition.
+Metrics are plain in-process counters, gauges and fixed-bucket histograms, cheap enough to
+stay on in production: a request costs a few lock-guarded increments and a perf_counter pair
+per SQL statement.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds in seconds; chosen around the millisecond range SQLite-backed routes live in
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+
+# Label for requests that matched no route, so unknown paths cannot grow the label set
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """A named metric family with a fixed set of label names"""
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    """Monotonic count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+    kind = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class CallbackGauge(Metric):
+    """Gauge whose samples are read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[tuple, float]]]
+    ):
+        super().__init__(name, description, labelnames)
+        self._collect = collect
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._collect():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram(Metric):
+    """Fixed-bucket histogram per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: tuple[str, ...], buckets: tuple[float, ...]):
+        super().__init__(name, description, labelnames)
+        self.buckets = buckets
+        # Per label set: non-cumulative bucket counts (last slot is +Inf), then sum
+        self._series: dict[tuple, tuple[list[int], list[float]]] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+REGISTRY: list[Metric] = []
+
+
+def register(metric: Metric) -> Metric:
+    """Add a metric to the /metrics exposition"""
+    REGISTRY.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+requests_total = register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+requests_in_flight = register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method", "route")
+))
+request_duration = register(Histogram(
+    "http_request_duration_seconds", "Time until the response starts", ("method", "route"), LATENCY_BUCKETS
+))
+request_db_duration = register(Histogram(
+    "http_request_db_seconds", "Database time spent per request", ("method", "route"), LATENCY_BUCKETS
+))
+request_db_queries = register(Counter(
+    "http_request_db_queries_total", "SQL statements executed on behalf of requests", ("method", "route")
+))
+query_duration = register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("statement",), QUERY_BUCKETS
+))
+
+
+@dataclass
+class RequestTimings:
+    """Database work attributed to the request being handled"""
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+# Set per request by the middleware. The object is shared, not copied, into the threadpool and
+# the greenlets that run sync sessions, so their statements count towards the request.
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    verb = statement.lstrip()[:6].upper()
+    query_duration.observe((verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER",), elapsed)
+
+    timings = current_timings.get()
+    if timings is not None:
+        timings.queries += 1
+        timings.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def register_pools(engines: dict[str, Engine]) -> None:
+    """Expose connection pool gauges for the named engines"""
+    def collect(read: Callable) -> Callable[[], Iterable[tuple[tuple, float]]]:
+        def samples():
+            for name, engine in engines.items():
+                pool = engine.pool
+                if hasattr(pool, "checkedout"):
+                    yield (name,), read(pool)
+        return samples
+
+    register(CallbackGauge(
+        "db_pool_checked_out", "Connections currently in use", ("engine",),
+        collect(lambda pool: pool.checkedout())
+    ))
+    register(CallbackGauge(
+        "db_pool_checked_in", "Idle connections held by the pool", ("engine",),
+        collect(lambda pool: pool.checkedin())
+    ))
+    register(CallbackGauge(
+        "db_pool_overflow", "Connections opened beyond pool_size", ("engine",),
+        collect(lambda pool: max(pool.overflow(), 0))
+    ))
+    register(CallbackGauge(
+        "db_pool_size", "Configured pool_size", ("engine",),
+        collect(lambda pool: pool.size())
+    ))
+
+
+def _route_label(scope) -> str:
+    # Set by the router once it has matched the request; the path template keeps labels bounded
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+async def track_in_flight(request: Request):
+    """
+    App-wide dependency counting requests in flight per route. It runs after routing, so the
+    matched route is known, and exits once the response (streamed or not) has been sent.
+    """
+    labels = (request.method, _route_label(request.scope))
+    requests_in_flight.inc(labels)
+    try:
+        yield
+    finally:
+        requests_in_flight.dec(labels)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency and database time, and adding a
+    Server-Timing header (app and db durations) to every response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                request_duration.observe((scope["method"], _route_label(scope)), elapsed)
+                server_timing = (
+                    f"app;dur={elapsed * 1000:.2f}, "
+                    f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries"'
+                )
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"server-timing", server_timing.encode())]
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            labels = (scope["method"], _route_label(scope))
+            requests_total.inc((*labels, status))
+            request_db_duration.observe(labels, timings.db_seconds)
+            request_db_queries.inc(labels, timings.queries)
+            current_timings.reset(token)
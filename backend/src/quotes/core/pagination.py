@@ -0,0 +1,41 @@
+"""
+Opaque cursor helpers for keyset pagination.
+Cursors are url-safe base64 encoded JSON arrays of the sort key of the last row served.
+"""
+import base64
+import json
+from datetime import datetime, timezone
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row into an opaque cursor string"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+
+    return values
+
+
+def sqlite_timestamp(value: datetime) -> str:
+    """
+    Render a datetime the way SQLite stores CURRENT_TIMESTAMP defaults.
+    Keyset comparisons are done against the stored text, so the cursor must match it exactly.
+    Aware datetimes are converted to UTC first, the zone CURRENT_TIMESTAMP is recorded in.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    if value.microsecond:
+        text += f".{value.microsecond:06d}"
+    return text
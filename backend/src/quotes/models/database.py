@@ -3,8 +3,8 @@ SQLAlchemy ORM models for database tables.
 These define the database schema and relationships.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, ForeignKey, Index, DDL, event
+from sqlalchemy.sql import func, table, column
 from sqlalchemy.orm import relationship
 from src.quotes.core.database import Base
 
@@ -18,6 +18,8 @@ class User(Base):
     email = Column(String(255), nullable=False, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Set when a cascade delete starts; the user is hidden from then on until the row is purged
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationship to quotes
     quotes = relationship("Quote", back_populates="user")
@@ -40,5 +42,367 @@ class Quote(Base):
     # Relationship to user
     user = relationship("User", back_populates="quotes")
 
+    # Composite indexes backing keyset pagination on (created_at, id), with and without filters
+    __table_args__ = (
+        Index("ix_quotes_created_at_id", "created_at", "id"),
+        Index("ix_quotes_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_quotes_author_created_at_id", "author", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Quote(id={self.id}, text='{self.text[:50]}...', user_id={self.user_id})>"
+
+
+class Counter(Base):
+    """
+    SQLAlchemy model for counters table.
+    Running totals kept in step with quotes and users by the triggers below, so list endpoints
+    can read totals without COUNT(*). Scopes: quotes, quotes.category, quotes.author, users, and
+    quotes.changes / users.changes which count every write and version cached list pages.
+    """
+    __tablename__ = "counters"
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True, default="")
+    value = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Counter(scope='{self.scope}', key='{self.key}', value={self.value})>"
+
+
+class CategorySummary(Base):
+    """
+    SQLAlchemy model for category_summary table.
+    One row per category in use with its quote count and newest created_at, kept in step with
+    quotes by the triggers below so the category facet never scans quotes.
+    """
+    __tablename__ = "category_summary"
+
+    category = Column(String(100), primary_key=True)
+    quote_count = Column(Integer, nullable=False, default=0)
+    latest_created_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<CategorySummary(category='{self.category}', quote_count={self.quote_count})>"
+
+
+class DailyQuote(Base):
+    """
+    SQLAlchemy model for daily_quotes table.
+    The quote of the day picked for each UTC date, recorded by the first request of the day so
+    every process serves the same pick until it ends.
+    """
+    __tablename__ = "daily_quotes"
+
+    day = Column(Date, primary_key=True)
+    quote_id = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<DailyQuote(day={self.day}, quote_id={self.quote_id})>"
+
+
+class UserDeletion(Base):
+    """
+    SQLAlchemy model for user_deletions table.
+    One row per background cascade delete of a user and their quotes, recording its progress;
+    user_id is kept without a foreign key since the user row is gone once the job completes.
+    """
+    __tablename__ = "user_deletions"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")
+    quotes_total = Column(Integer, nullable=False, default=0)
+    quotes_deleted = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<UserDeletion(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
+
+
+class QuoteChange(Base):
+    """
+    SQLAlchemy model for quote_changes table.
+    Append-only log of quote creates, updates and deletes written by the triggers below, read
+    by the change feed. AUTOINCREMENT keeps ids increasing even after old entries are pruned,
+    so an id is a stable cursor.
+    """
+    __tablename__ = "quote_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    quote_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<QuoteChange(id={self.id}, quote_id={self.quote_id}, operation='{self.operation}')>"
+
+
+class UserChange(Base):
+    """
+    SQLAlchemy model for user_changes table.
+    Append-only log of user updates and deletes written by the triggers below, read by every
+    worker process to invalidate its user cache.
+    """
+    __tablename__ = "user_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<UserChange(id={self.id}, user_id={self.user_id})>"
+
+
+# FTS5 index over quotes.text. It is an external-content table, so it stores only the
+# index and reads text back from quotes; the triggers keep it in step with every write.
+QUOTES_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5(
+        text, content='quotes', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_fts_ai AFTER INSERT ON quotes BEGIN
+        INSERT INTO quotes_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_fts_ad AFTER DELETE ON quotes BEGIN
+        INSERT INTO quotes_fts(quotes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_fts_au AFTER UPDATE OF text ON quotes BEGIN
+        INSERT INTO quotes_fts(quotes_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO quotes_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+
+for statement in QUOTES_FTS_DDL:
+    event.listen(Quote.__table__, "after_create", DDL(statement))
+
+# Lightweight handle on the virtual table for queries; it is not part of Base.metadata
+quotes_fts = table("quotes_fts", column("rowid"), column("rank"))
+
+
+# FTS5 index for user autocomplete over name and the local part of email (the domain is left
+# out: a handful of domains would match most users and make those prefixes slow). It is
+# contentless, so deletes hand the old values back to the index. The prefix option keeps
+# prefix indexes for one to three characters, so short prefixes need no term scan.
+USERS_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name, email_local, content='', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, email_local)
+        VALUES (new.id, new.name, substr(new.email, 1, instr(new.email, '@') - 1));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, email_local)
+        VALUES ('delete', old.id, old.name, substr(old.email, 1, instr(old.email, '@') - 1));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, email_local)
+        VALUES ('delete', old.id, old.name, substr(old.email, 1, instr(old.email, '@') - 1));
+        INSERT INTO users_fts(rowid, name, email_local)
+        VALUES (new.id, new.name, substr(new.email, 1, instr(new.email, '@') - 1));
+    END
+    """,
+]
+
+for statement in USERS_FTS_DDL:
+    event.listen(User.__table__, "after_create", DDL(statement))
+
+users_fts = table("users_fts", column("rowid"))
+
+
+# Triggers maintaining the counters table. They run inside the transaction of the write that
+# fires them, so totals move atomically with the rows no matter which code path writes.
+COUNTERS_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_quotes_ai AFTER INSERT ON quotes BEGIN
+        INSERT INTO counters(scope, key, value) VALUES
+            ('quotes', '', 1),
+            ('quotes.category', COALESCE(new.category, ''), 1),
+            ('quotes.author', CAST(new.author AS TEXT), 1),
+            ('quotes.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_quotes_ad AFTER DELETE ON quotes BEGIN
+        INSERT INTO counters(scope, key, value) VALUES
+            ('quotes', '', -1),
+            ('quotes.category', COALESCE(old.category, ''), -1),
+            ('quotes.author', CAST(old.author AS TEXT), -1),
+            ('quotes.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_quotes_au AFTER UPDATE ON quotes BEGIN
+        INSERT INTO counters(scope, key, value) VALUES
+            ('quotes.category', COALESCE(old.category, ''), -1),
+            ('quotes.category', COALESCE(new.category, ''), 1),
+            ('quotes.author', CAST(old.author AS TEXT), -1),
+            ('quotes.author', CAST(new.author AS TEXT), 1),
+            ('quotes.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_users_ai AFTER INSERT ON users BEGIN
+        INSERT INTO counters(scope, key, value) VALUES ('users', '', 1), ('users.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_users_ad AFTER DELETE ON users BEGIN
+        INSERT INTO counters(scope, key, value) VALUES
+            ('users', '', -(old.deleted_at IS NULL)),
+            ('users.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+    # Users pending deletion are hidden, so they leave the users total when deleted_at is set
+    """
+    CREATE TRIGGER IF NOT EXISTS counters_users_au AFTER UPDATE ON users BEGIN
+        INSERT INTO counters(scope, key, value) VALUES
+            ('users', '', (old.deleted_at IS NOT NULL) - (new.deleted_at IS NOT NULL)),
+            ('users.changes', '', 1)
+        ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value;
+    END
+    """,
+]
+
+# Attached to the metadata rather than a table so every table the triggers touch exists first
+for statement in COUNTERS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
+
+
+# Triggers maintaining category_summary. Removing a quote only recomputes the newest created_at
+# when the removed quote was the newest, via ix_quotes_category_created_at_id; emptied categories
+# are deleted.
+CATEGORY_SUMMARY_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS category_summary_ai AFTER INSERT ON quotes
+    WHEN new.category IS NOT NULL BEGIN
+        INSERT INTO category_summary(category, quote_count, latest_created_at)
+        VALUES (new.category, 1, new.created_at)
+        ON CONFLICT(category) DO UPDATE SET
+            quote_count = quote_count + 1,
+            latest_created_at = max(latest_created_at, excluded.latest_created_at);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS category_summary_ad AFTER DELETE ON quotes
+    WHEN old.category IS NOT NULL BEGIN
+        UPDATE category_summary SET
+            quote_count = quote_count - 1,
+            latest_created_at = CASE WHEN old.created_at >= latest_created_at
+                THEN (SELECT max(created_at) FROM quotes WHERE category = old.category)
+                ELSE latest_created_at END
+        WHERE category = old.category;
+        DELETE FROM category_summary WHERE category = old.category AND quote_count <= 0;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS category_summary_au AFTER UPDATE OF category, created_at ON quotes
+    WHEN old.category IS NOT new.category OR old.created_at IS NOT new.created_at BEGIN
+        UPDATE category_summary SET
+            quote_count = quote_count - 1,
+            latest_created_at = CASE WHEN old.created_at >= latest_created_at
+                THEN (SELECT max(created_at) FROM quotes WHERE category = old.category AND id != old.id)
+                ELSE latest_created_at END
+        WHERE category = old.category;
+        DELETE FROM category_summary WHERE category = old.category AND quote_count <= 0;
+        INSERT INTO category_summary(category, quote_count, latest_created_at)
+        SELECT new.category, 1, new.created_at WHERE new.category IS NOT NULL
+        ON CONFLICT(category) DO UPDATE SET
+            quote_count = quote_count + 1,
+            latest_created_at = max(latest_created_at, excluded.latest_created_at);
+    END
+    """,
+]
+
+for statement in CATEGORY_SUMMARY_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
+
+
+# Triggers refusing quotes for users pending deletion, so a cascade delete cannot race new
+# quotes in. They fail like the author foreign key does and are reported the same way.
+HIDDEN_AUTHOR_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_hidden_author_bi BEFORE INSERT ON quotes
+    WHEN (SELECT deleted_at FROM users WHERE id = new.author) IS NOT NULL BEGIN
+        SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: author is being deleted');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quotes_hidden_author_bu BEFORE UPDATE OF author ON quotes
+    WHEN (SELECT deleted_at FROM users WHERE id = new.author) IS NOT NULL BEGIN
+        SELECT RAISE(ABORT, 'FOREIGN KEY constraint failed: author is being deleted');
+    END
+    """,
+]
+
+for statement in HIDDEN_AUTHOR_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
+
+
+# Triggers appending to the change log in the transaction of the write they record, so every
+# code path that touches quotes (API, bulk routes, admin) shows up in the feed; deletes leave
+# a tombstone.
+QUOTE_CHANGES_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS quote_changes_ai AFTER INSERT ON quotes BEGIN
+        INSERT INTO quote_changes(quote_id, operation) VALUES (new.id, 'create');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quote_changes_au AFTER UPDATE ON quotes BEGIN
+        INSERT INTO quote_changes(quote_id, operation) VALUES (new.id, 'update');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quote_changes_ad AFTER DELETE ON quotes BEGIN
+        INSERT INTO quote_changes(quote_id, operation) VALUES (old.id, 'delete');
+    END
+    """,
+]
+
+for statement in QUOTE_CHANGES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
+
+
+# Triggers logging user writes that can leave a cached user stale. Inserts are not logged:
+# a user that did not exist cannot be cached.
+USER_CHANGES_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS user_changes_au AFTER UPDATE ON users BEGIN
+        INSERT INTO user_changes(user_id) VALUES (new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS user_changes_ad AFTER DELETE ON users BEGIN
+        INSERT INTO user_changes(user_id) VALUES (old.id);
+    END
+    """,
+]
+
+for statement in USER_CHANGES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
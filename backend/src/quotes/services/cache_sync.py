@@ -0,0 +1,151 @@
+"""
+Cross-process coherence for the in-process caches.
+Each worker process keeps its own quote cache, user cache and random-id index, so a write made
+by one worker leaves the others' entries stale. Every write appends to the trigger-written
+quote_changes and user_changes logs in its own transaction; each worker follows both logs from
+its position and drops exactly the entries the new changes touch. Idle checks are two max(id)
+lookups, and caches keep their hit rates while going stale for at most one interval.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.core.cache import quote_cache, user_cache
+from src.quotes.core.config import CACHE_SYNC_MS
+from src.quotes.core.database import async_read_session
+from src.quotes.core.id_index import quote_ids
+from src.quotes.models.database import (
+    Quote as QuoteModel, QuoteChange as QuoteChangeModel, UserChange as UserChangeModel
+)
+from src.quotes.services.changes import prune_log
+
+logger = logging.getLogger("quotes.cache_sync")
+
+# Log entries read per query while catching up
+SYNC_BATCH_SIZE = 1000
+
+
+class CacheSyncService:
+    """Service class for applying the change logs to this process's caches"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def heads(self) -> Tuple[int, int]:
+        """Ids of the newest quote and user changes, 0 while a log is empty"""
+        return (
+            self.db.scalar(select(func.max(QuoteChangeModel.id))) or 0,
+            self.db.scalar(select(func.max(UserChangeModel.id))) or 0,
+        )
+
+    def apply_changes(self, quote_position: int, user_position: int) -> Tuple[int, int]:
+        """
+        Invalidate what the changes after the given positions touched; returns the new positions.
+        A process that fell further behind than a cache holds clears that cache instead.
+        """
+        quote_head, user_head = self.heads()
+
+        if quote_head - quote_position > max(quote_cache.maxsize, SYNC_BATCH_SIZE):
+            quote_cache.clear()
+            quote_ids.clear()
+            quote_position = quote_head
+        while quote_position < quote_head:
+            rows = self.db.execute(
+                select(
+                    QuoteChangeModel.id, QuoteChangeModel.quote_id, QuoteChangeModel.operation,
+                    QuoteModel.category, QuoteModel.author
+                )
+                .outerjoin(QuoteModel, QuoteModel.id == QuoteChangeModel.quote_id)
+                .where(QuoteChangeModel.id > quote_position, QuoteChangeModel.id <= quote_head)
+                .order_by(QuoteChangeModel.id)
+                .limit(SYNC_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                quote_cache.invalidate(row.quote_id)
+                quote_ids.apply_change(row.quote_id, row.operation, row.category, row.author)
+            quote_position = rows[-1].id
+
+        if user_head - user_position > max(user_cache.maxsize, SYNC_BATCH_SIZE):
+            user_cache.clear()
+            user_position = user_head
+        while user_position < user_head:
+            rows = self.db.execute(
+                select(UserChangeModel.id, UserChangeModel.user_id)
+                .where(UserChangeModel.id > user_position, UserChangeModel.id <= user_head)
+                .order_by(UserChangeModel.id)
+                .limit(SYNC_BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                user_cache.invalidate(row.user_id)
+            user_position = rows[-1].id
+
+        return quote_position, user_position
+
+    def prune(self, retention_days: float) -> int:
+        """Delete user changes older than the retention period; returns the number deleted"""
+        return prune_log(self.db, UserChangeModel, retention_days)
+
+
+class AsyncCacheSyncService:
+    """
+    Async variant of CacheSyncService for use with an AsyncSession.
+    Each call runs the CacheSyncService logic through run_sync on the aiosqlite driver.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def heads(self) -> Tuple[int, int]:
+        """Ids of the newest quote and user changes"""
+        return await self.db.run_sync(lambda db: CacheSyncService(db).heads())
+
+    async def apply_changes(self, quote_position: int, user_position: int) -> Tuple[int, int]:
+        """Invalidate what the changes after the given positions touched"""
+        return await self.db.run_sync(
+            lambda db: CacheSyncService(db).apply_changes(quote_position, user_position)
+        )
+
+
+class CacheSynchronizer:
+    """Follows the change logs from a task on the serving event loop"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._position: Tuple[int, int] = (0, 0)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start following from the current heads; a no-op when the interval is 0"""
+        if self.interval <= 0:
+            return
+        async with self.session_factory() as db:
+            self._position = await AsyncCacheSyncService(db).heads()
+        quote_ids.follow_log(True)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop following"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        quote_ids.follow_log(False)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                async with self.session_factory() as db:
+                    self._position = await AsyncCacheSyncService(db).apply_changes(*self._position)
+            except Exception:
+                logger.exception("Applying the change logs to the caches failed")
+
+
+cache_sync = CacheSynchronizer(async_read_session, CACHE_SYNC_MS / 1000)
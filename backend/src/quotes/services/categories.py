@@ -0,0 +1,62 @@
+"""
+Service layer for the category facet.
+Category counts and newest timestamps are maintained by triggers in category_summary;
+this service reads them and rebuilds the table from quotes when drift needs repairing.
+"""
+from typing import List
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.api.serialization import trusted_construct
+from src.quotes.models.database import CategorySummary as CategorySummaryModel
+from src.quotes.api.schemas import CategorySummary
+
+# Statements recomputing the summary from quotes
+REBUILD_STATEMENTS = [
+    "DELETE FROM category_summary",
+    """
+    INSERT INTO category_summary(category, quote_count, latest_created_at)
+    SELECT category, COUNT(*), MAX(created_at) FROM quotes WHERE category IS NOT NULL GROUP BY category
+    """,
+    # Bump the change counter so cached category lists revalidate against the repaired summary
+    """
+    INSERT INTO counters(scope, key, value) VALUES ('quotes.changes', '', 1)
+    ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value
+    """,
+]
+
+
+class CategoryService:
+    """Service class for the category summary"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def get_categories(self) -> List[CategorySummary]:
+        """Every category in use with its quote count and newest created_at, by name"""
+        rows = self.db.scalars(select(CategorySummaryModel).order_by(CategorySummaryModel.category))
+        return [
+            trusted_construct(CategorySummary, {
+                "category": row.category,
+                "count": row.quote_count,
+                "latest_created_at": row.latest_created_at
+            })
+            for row in rows
+        ]
+    
+    def rebuild(self) -> None:
+        """Recompute the summary from quotes in one transaction"""
+        for statement in REBUILD_STATEMENTS:
+            self.db.execute(text(statement))
+        self.db.commit()
+
+
+class AsyncCategoryService:
+    """Async variant of CategoryService for use with an AsyncSession"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_categories(self) -> List[CategorySummary]:
+        """Every category in use with its quote count and newest created_at"""
+        return await self.db.run_sync(lambda db: CategoryService(db).get_categories())
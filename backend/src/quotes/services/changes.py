@@ -0,0 +1,247 @@
+"""
+Service layer for the quote change feed.
+The quote_changes log is appended to by triggers in the transaction of every quote write; this
+service reads it from a cursor and prunes old entries. ChangeNotifier lets long-poll and SSE
+clients wait for the log to grow without each of them polling the database.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+from sqlalchemy import String, delete, event, func, select, type_coerce
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.api.serialization import trusted_construct
+from src.quotes.core.config import CHANGE_FEED_POLL_MS, CHANGE_LOG_PRUNE_MINUTES, CHANGE_LOG_RETENTION_DAYS
+from src.quotes.core.database import AsyncSessionLocal, WriterSession, async_read_session
+from src.quotes.core.pagination import encode_cursor, decode_cursor, sqlite_timestamp
+from src.quotes.models.database import (
+    Quote as QuoteModel, QuoteChange as QuoteChangeModel, UserChange as UserChangeModel
+)
+from src.quotes.services.quotes import QuoteService
+from src.quotes.api.schemas import QuoteChange
+
+logger = logging.getLogger("quotes.changes")
+
+
+class CursorExpiredError(ValueError):
+    """The cursor points before the oldest change still kept; the client has to resync"""
+
+
+class ChangeService:
+    """Service class for reading and pruning the quote change log"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def head(self) -> int:
+        """Id of the newest change, 0 while the log is empty"""
+        return self.db.scalar(select(func.max(QuoteChangeModel.id))) or 0
+
+    def cursor_position(self, cursor: Optional[str]) -> int:
+        """
+        Change id a cursor stands for; no cursor means the current head, so only changes made
+        from now on are returned. Raises ValueError for a malformed cursor and
+        CursorExpiredError when changes after it have already been pruned.
+        """
+        if cursor is None:
+            return self.head()
+
+        (position,) = decode_cursor(cursor, 1)
+        if not isinstance(position, int) or position < 0:
+            raise ValueError("Invalid cursor")
+
+        oldest = self.db.scalar(select(func.min(QuoteChangeModel.id)))
+        if oldest is not None and position < oldest - 1:
+            raise CursorExpiredError("Cursor has expired, reload the quotes and follow the feed from now on")
+        return position
+
+    def get_changes(self, after: int, limit: int = 100) -> List[QuoteChange]:
+        """Changes after the given change id, oldest first, with the current state of each quote"""
+        rows = self.db.execute(
+            select(QuoteChangeModel, QuoteModel)
+            .outerjoin(QuoteModel, QuoteModel.id == QuoteChangeModel.quote_id)
+            .where(QuoteChangeModel.id > after)
+            .order_by(QuoteChangeModel.id)
+            .limit(limit)
+        ).all()
+        return [
+            trusted_construct(QuoteChange, {
+                "cursor": encode_cursor(change.id),
+                "quote_id": change.quote_id,
+                "operation": change.operation,
+                "changed_at": change.changed_at,
+                "quote": (
+                    QuoteService._convert_to_pydantic(db_quote)
+                    if db_quote is not None and change.operation != "delete" else None
+                )
+            })
+            for change, db_quote in rows
+        ]
+
+    def prune(self, retention_days: float) -> int:
+        """
+        Delete changes older than the retention period, always keeping the newest so cursors
+        stay checkable. Returns the number of changes deleted.
+        """
+        return prune_log(self.db, QuoteChangeModel, retention_days)
+
+
+def prune_log(db: Session, model, retention_days: float) -> int:
+    """Delete entries of a trigger-written change log older than the retention period, keeping the newest"""
+    head = db.scalar(select(func.max(model.id))) or 0
+    cutoff = sqlite_timestamp(datetime.now(timezone.utc) - timedelta(days=retention_days))
+    first_kept = db.scalar(
+        select(model.id)
+        .where(type_coerce(model.changed_at, String) >= cutoff)
+        .order_by(model.id)
+        .limit(1)
+    )
+    bound = min(first_kept or head, head)
+    deleted = db.execute(delete(model).where(model.id < bound)).rowcount
+    db.commit()
+    return deleted
+
+
+class AsyncChangeService:
+    """
+    Async variant of ChangeService for use with an AsyncSession.
+    Each call runs the ChangeService logic through run_sync on the aiosqlite driver.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def head(self) -> int:
+        """Id of the newest change"""
+        return await self.db.run_sync(lambda db: ChangeService(db).head())
+
+    async def cursor_position(self, cursor: Optional[str]) -> int:
+        """Change id a cursor stands for"""
+        return await self.db.run_sync(lambda db: ChangeService(db).cursor_position(cursor))
+
+    async def get_changes(self, after: int, limit: int = 100) -> List[QuoteChange]:
+        """Changes after the given change id, oldest first"""
+        return await self.db.run_sync(lambda db: ChangeService(db).get_changes(after, limit))
+
+
+class ChangeNotifier:
+    """
+    Wakes clients waiting for changes. While anyone waits, one poller task per event loop reads
+    the log's head every interval, so the database sees one cheap query per interval however
+    many clients wait; commits in this process nudge the poller to look at once.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], interval: float):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._head = 0
+        self._waiters = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._nudged: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+
+    async def wait(self, after: int, timeout: float) -> bool:
+        """Wait until the log holds a change after the given id; False if the timeout passed first"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Created lazily on the serving loop (and again if a new loop takes over)
+            self._loop = loop
+            self._changed = asyncio.Condition()
+            self._nudged = asyncio.Event()
+            self._poller = None
+
+        self._waiters += 1
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._poll())
+        try:
+            async with self._changed:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self._head > after), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters -= 1
+
+    async def close(self) -> None:
+        """Stop the poller task"""
+        if self._poller is not None and not self._poller.done():
+            self._poller.cancel()
+            await asyncio.gather(self._poller, return_exceptions=True)
+        self._poller = None
+
+    def nudge(self) -> None:
+        """Ask the poller to check now; safe to call from any thread"""
+        loop, nudged = self._loop, self._nudged
+        if loop is not None and nudged is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(nudged.set)
+
+    async def _poll(self) -> None:
+        while self._waiters:
+            self._nudged.clear()
+            async with self.session_factory() as db:
+                head = await AsyncChangeService(db).head()
+            if head > self._head:
+                self._head = head
+                async with self._changed:
+                    self._changed.notify_all()
+            try:
+                await asyncio.wait_for(self._nudged.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class ChangeLogPruner:
+    """
+    Keeps the trigger-written change logs bounded: prunes them at startup and then every
+    interval from a task on the serving event loop. Every worker process prunes; the deletes
+    are idempotent, so overlapping runs only repeat a cheap lookup.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], models: list, interval: float, retention_days: float):
+        self.session_factory = session_factory
+        self.models = models
+        self.interval = interval
+        self.retention_days = retention_days
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start pruning; a no-op when the interval is 0"""
+        if self.interval <= 0:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop pruning"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def prune(self) -> int:
+        """Prune every log once; returns the number of entries deleted"""
+        async with self.session_factory() as db:
+            return await db.run_sync(
+                lambda db: sum(prune_log(db, model, self.retention_days) for model in self.models)
+            )
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.prune()
+            except Exception:
+                logger.exception("Pruning the change logs failed")
+            await asyncio.sleep(self.interval)
+
+
+quote_changes = ChangeNotifier(async_read_session, CHANGE_FEED_POLL_MS / 1000)
+
+change_log_pruner = ChangeLogPruner(
+    AsyncSessionLocal, [QuoteChangeModel, UserChangeModel], CHANGE_LOG_PRUNE_MINUTES * 60, CHANGE_LOG_RETENTION_DAYS
+)
+
+
+@event.listens_for(WriterSession, "after_commit")
+def _nudge_waiters(session):
+    quote_changes.nudge()
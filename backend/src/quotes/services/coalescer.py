@@ -0,0 +1,95 @@
+"""
+Group commit for quote creation.
+SQLite has a single writer and every COMMIT pays an fsync, so a burst of concurrent POSTs
+queues on the write lock one fsync at a time. The coalescer funnels creates through one writer
+task that inserts whatever has queued up (within a short window, up to a batch limit) in a
+single transaction, then resolves each caller with its own row or error.
+"""
+import asyncio
+from typing import Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.core.config import WRITE_COALESCING, WRITE_COALESCE_WINDOW_MS, WRITE_COALESCE_MAX_BATCH
+from src.quotes.core.database import AsyncSessionLocal
+from src.quotes.services.quotes import AsyncQuoteService
+from src.quotes.api.schemas import Quote, QuoteCreate
+
+
+class QuoteWriteCoalescer:
+    """Batches concurrent quote creates into shared transactions"""
+    
+    def __init__(self, session_factory: Callable[[], AsyncSession], window: float, max_batch: int):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def create_quote(self, quote_data: QuoteCreate) -> Quote:
+        """Create a quote as part of the next batch; raises the same errors as create_quote"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            # Started lazily on the serving loop (and again if a new loop takes over)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((quote_data, future))
+        return await future
+    
+    async def close(self) -> None:
+        """Write out anything still queued and stop the writer task"""
+        if self._worker is None or self._worker.done():
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        self._worker = None
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - self._loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _write(self, batch: list) -> None:
+        try:
+            async with self.session_factory() as db:
+                results = await AsyncQuoteService(db).create_quotes([quote_data for quote_data, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                # Isolate the row that broke the shared transaction
+                for item in batch:
+                    await self._write([item])
+                return
+            results = [e]
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+quote_writes = (
+    QuoteWriteCoalescer(AsyncSessionLocal, WRITE_COALESCE_WINDOW_MS / 1000, WRITE_COALESCE_MAX_BATCH)
+    if WRITE_COALESCING else None
+)
@@ -0,0 +1,68 @@
+"""
+Service layer for maintained counters.
+Totals are written by triggers in the same transaction as the rows they count;
+this service reads them and rebuilds them from scratch when drift needs repairing.
+"""
+from typing import Optional
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from src.quotes.models.database import Counter as CounterModel
+
+# Statements recomputing every total from the base tables
+REBUILD_STATEMENTS = [
+    "DELETE FROM counters WHERE scope IN ('quotes', 'quotes.category', 'quotes.author', 'users')",
+    "INSERT INTO counters(scope, key, value) SELECT 'quotes', '', COUNT(*) FROM quotes",
+    """
+    INSERT INTO counters(scope, key, value)
+    SELECT 'quotes.category', COALESCE(category, ''), COUNT(*) FROM quotes GROUP BY COALESCE(category, '')
+    """,
+    """
+    INSERT INTO counters(scope, key, value)
+    SELECT 'quotes.author', CAST(author AS TEXT), COUNT(*) FROM quotes GROUP BY author
+    """,
+    "INSERT INTO counters(scope, key, value) SELECT 'users', '', COUNT(*) FROM users WHERE deleted_at IS NULL",
+    # Bump the change counters so cached list pages revalidate against the repaired totals
+    """
+    INSERT INTO counters(scope, key, value) VALUES ('quotes.changes', '', 1), ('users.changes', '', 1)
+    ON CONFLICT(scope, key) DO UPDATE SET value = value + excluded.value
+    """,
+]
+
+
+class CounterService:
+    """Service class for reading and repairing maintained counters"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, scope: str, key: str = "") -> int:
+        """Current value of a counter; counters that were never written are zero"""
+        value = self.db.scalar(
+            select(CounterModel.value).where(CounterModel.scope == scope, CounterModel.key == key)
+        )
+        return value or 0
+
+    def quote_total(self, category: Optional[str] = None, author: Optional[int] = None) -> Optional[int]:
+        """
+        Total number of quotes matching the filters, or None when no single counter covers them
+        (both category and author given).
+        """
+        if category and author:
+            return None
+        if category:
+            return self.get("quotes.category", category)
+        if author:
+            return self.get("quotes.author", str(author))
+        return self.get("quotes")
+
+    def estimate_quote_total(self, category: Optional[str] = None, author: Optional[int] = None) -> int:
+        """Upper-bound estimate of the quotes matching the filters, always answered from counters"""
+        if category and author:
+            return min(self.get("quotes.category", category), self.get("quotes.author", str(author)))
+        return self.quote_total(category, author)
+
+    def rebuild(self) -> None:
+        """Recompute every total from the base tables in one transaction"""
+        for statement in REBUILD_STATEMENTS:
+            self.db.execute(text(statement))
+        self.db.commit()
@@ -2,12 +2,32 @@
 Service layer for business logic.
 This layer handles all the business logic and database operations.
 """
-from datetime import datetime
-from typing import List, Optional
+import hashlib
+import random
+import re
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from src.quotes.models.database import Quote as QuoteModel, User as UserModel
-from src.quotes.api.schemas import Quote, QuoteCreate, QuoteUpdate
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, tuple_, type_coerce, literal, select, insert, update, delete, func, text, String, Integer, Float
+from src.quotes.api.serialization import trusted_construct
+from src.quotes.core.cache import quote_cache
+from src.quotes.core.id_index import quote_ids
+from src.quotes.services.counters import CounterService
+from src.quotes.services.users import UserService
+from src.quotes.core.pagination import encode_cursor, decode_cursor, sqlite_timestamp
+from src.quotes.models.database import (
+    Quote as QuoteModel, User as UserModel, DailyQuote as DailyQuoteModel, quotes_fts
+)
+from src.quotes.api.schemas import Quote, QuoteCreate, QuoteUpdate, QuoteFilter, QuoteSearchResult, User
+
+
+# Index picks tried before a list that keeps returning stale ids is reloaded
+RANDOM_PICK_ATTEMPTS = 8
+
+# Quotes per statement and transaction in filter-based bulk updates and deletes
+BULK_CHUNK_SIZE = 1000
 
 
 class QuoteService:
@@ -17,111 +37,667 @@ class QuoteService:
         self.db = db
     
     def create_quote(self, quote_data: QuoteCreate) -> Quote:
-        """Create a new quote"""
-        # Verify user exists
-        user = self.db.query(UserModel).filter(UserModel.id == quote_data.author).first()
-        if not user:
-            raise ValueError(f"User with id {quote_data.author} not found")
-        
-        db_quote = QuoteModel(
-            text=quote_data.text,
-            category=quote_data.category,
-            author=quote_data.author
-        )
-        
-        self.db.add(db_quote)
-        self.db.commit()
-        self.db.refresh(db_quote)
+        """Create a new quote with one INSERT ... RETURNING; the author foreign key rejects unknown users"""
+        try:
+            db_quote = self.db.scalars(
+                insert(QuoteModel)
+                .values(text=quote_data.text, category=quote_data.category, author=quote_data.author)
+                .returning(QuoteModel)
+            ).one()
+            self.db.commit()
+        except IntegrityError as e:
+            self._raise_for_author(e, quote_data.author)
+        quote_ids.add(db_quote.id, db_quote.category, db_quote.author)
         
         return self._convert_to_pydantic(db_quote)
     
+    def create_quotes(self, quotes: List[QuoteCreate]) -> List[Union[Quote, ValueError]]:
+        """
+        Create several quotes with one INSERT ... RETURNING and a single commit.
+        Returns, in order, each quote's row or the error that rejected it; used by the write
+        coalescer to serve concurrent creates with one fsync.
+        """
+        author_ids = {quote_data.author for quote_data in quotes}
+        existing = set(self.db.scalars(
+            select(UserModel.id).where(UserModel.id.in_(author_ids), UserModel.deleted_at.is_(None))
+        ))
+        
+        results: List[Union[Quote, ValueError]] = []
+        values = []
+        positions = []
+        for position, quote_data in enumerate(quotes):
+            if quote_data.author not in existing:
+                results.append(ValueError(f"User with id {quote_data.author} not found"))
+                continue
+            results.append(None)
+            positions.append(position)
+            values.append({
+                "text": quote_data.text,
+                "category": quote_data.category,
+                "author": quote_data.author
+            })
+        
+        if values:
+            db_quotes = self.db.scalars(
+                insert(QuoteModel).returning(QuoteModel, sort_by_parameter_order=True),
+                values
+            ).all()
+            self.db.commit()
+            for position, db_quote in zip(positions, db_quotes):
+                quote_ids.add(db_quote.id, db_quote.category, db_quote.author)
+                results[position] = self._convert_to_pydantic(db_quote)
+        
+        return results
+    
+    def bulk_create_quotes(self, rows: List[tuple[int, QuoteCreate]]) -> tuple[int, List[tuple[int, str]]]:
+        """
+        Insert a chunk of quotes in one transaction.
+        Authors are checked with a single set-based lookup and the rows go in with one executemany.
+        Returns the number inserted and (index, error) for every rejected row.
+        """
+        author_ids = {quote_data.author for _, quote_data in rows}
+        existing = set(
+            self.db.scalars(
+                select(UserModel.id).where(UserModel.id.in_(author_ids), UserModel.deleted_at.is_(None))
+            )
+        ) if author_ids else set()
+        
+        values = []
+        errors = []
+        for index, quote_data in rows:
+            if quote_data.author not in existing:
+                errors.append((index, f"User with id {quote_data.author} not found"))
+                continue
+            values.append({
+                "text": quote_data.text,
+                "category": quote_data.category,
+                "author": quote_data.author
+            })
+        
+        if values:
+            self.db.execute(insert(QuoteModel), values)
+            self.db.commit()
+            # New ids are not known here, so the affected id lists reload on their next pick
+            quote_ids.invalidate(("all",))
+            for row in values:
+                quote_ids.invalidate(("author", row["author"]))
+                if row["category"]:
+                    quote_ids.invalidate(("category", row["category"]))
+        
+        return len(values), errors
+    
     def get_quotes(
         self, 
         page: int = 1, 
         per_page: int = 10, 
         category: Optional[str] = None, 
-        author: Optional[int] = None
-    ) -> tuple[List[Quote], int]:
-        """Get quotes with pagination and filtering"""
+        author: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
+        expand_author: bool = False
+    ) -> tuple[List[Quote], Optional[int], Optional[str]]:
+        """
+        Get quotes with pagination and filtering.
+        With a cursor the page is read by keyset on (created_at, id) and no total is computed.
+        Totals come from the maintained counters; an exact total for a category and author
+        together falls back to COUNT(*) unless an estimate is acceptable.
+        With expand_author the page's authors are loaded by one extra IN query; missing or hidden authors are left out.
+        """
         
         # Build query with filters
-        query = self.db.query(QuoteModel)
+        query = self.db.query(QuoteModel).filter(*self._filters(category, author))
         
-        if category:
-            query = query.filter(QuoteModel.category == category)
+        # Apply sorting (latest first), id breaks ties between quotes created in the same second
+        ordered = query.order_by(QuoteModel.created_at.desc(), QuoteModel.id.desc())
         
-        if author:
-            query = query.filter(QuoteModel.author == author)
+        if cursor:
+            created_at, quote_id = decode_cursor(cursor, 2)
+            total = None
+            ordered = ordered.filter(
+                tuple_(type_coerce(QuoteModel.created_at, String), QuoteModel.id)
+                < tuple_(literal(created_at, String), literal(quote_id, Integer))
+            )
+        else:
+            total = None
+            if include_total:
+                counters = CounterService(self.db)
+                if estimate_total:
+                    total = counters.estimate_quote_total(category, author)
+                else:
+                    total = counters.quote_total(category, author)
+                    if total is None:
+                        total = query.count()
+            ordered = ordered.offset((page - 1) * per_page)
         
-        # Get total count
-        total = query.count()
+        # Fetch one extra row to know whether another page follows
+        db_quotes = ordered.limit(per_page + 1).all()
+        next_cursor = None
+        if len(db_quotes) > per_page:
+            db_quotes = db_quotes[:per_page]
+            last = db_quotes[-1]
+            next_cursor = encode_cursor(sqlite_timestamp(last.created_at), last.id)
         
-        # Apply sorting (latest first) and pagination
-        offset = (page - 1) * per_page
-        db_quotes = query.order_by(QuoteModel.created_at.desc()).offset(offset).limit(per_page).all()
-        
-        # Convert to Pydantic models
+        # Convert to Pydantic models; authors, when expanded, take one more query
         quotes = [self._convert_to_pydantic(q) for q in db_quotes]
+        if expand_author:
+            quotes = self._with_authors(quotes)
         
-        return quotes, total
+        return quotes, total, next_cursor
     
-    def get_quote_by_id(self, quote_id: int) -> Optional[Quote]:
-        """Get a specific quote by ID"""
-        db_quote = self.db.query(QuoteModel).filter(QuoteModel.id == quote_id).first()
+    def get_quotes_version(self) -> int:
+        """Number of writes ever made to quotes, used to validate cached list pages"""
+        return CounterService(self.db).get("quotes.changes")
+    
+    def search_quotes(
+        self,
+        q: str,
+        per_page: int = 10,
+        cursor: Optional[str] = None
+    ) -> tuple[List[QuoteSearchResult], Optional[str]]:
+        """
+        Full-text search over quote text, best BM25 matches first.
+        Pages are read by keyset on (rank, id) through the opaque cursor.
+        """
+        rank = quotes_fts.c.rank
+        query = (
+            select(
+                QuoteModel,
+                rank,
+                func.highlight(text("quotes_fts"), 0, "<mark>", "</mark>")
+            )
+            .join(quotes_fts, quotes_fts.c.rowid == QuoteModel.id)
+            .where(text("quotes_fts MATCH :match"))
+            .order_by(rank, QuoteModel.id)
+        )
         
-        if not db_quote:
-            return None
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, 2)
+            query = query.where(
+                tuple_(rank, QuoteModel.id) > tuple_(literal(last_rank, Float), literal(last_id, Integer))
+            )
         
-        return self._convert_to_pydantic(db_quote)
+        rows = self.db.execute(
+            query.limit(per_page + 1),
+            {"match": self._fts_query(q)}
+        ).all()
+        
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            last_quote, last_rank, _ = rows[-1]
+            next_cursor = encode_cursor(last_rank, last_quote.id)
+        
+        results = [
+            trusted_construct(QuoteSearchResult, {
+                "text": db_quote.text,
+                "category": db_quote.category,
+                "author": db_quote.author,
+                "id": db_quote.id,
+                "created_at": db_quote.created_at,
+                "updated_at": db_quote.updated_at,
+                "author_details": None,
+                "rank": row_rank,
+                "highlight": highlight
+            })
+            for db_quote, row_rank, highlight in rows
+        ]
+        
+        return results, next_cursor
     
-    def update_quote(self, quote_id: int, quote_update: QuoteUpdate) -> Optional[Quote]:
-        """Update a specific quote"""
-        db_quote = self.db.query(QuoteModel).filter(QuoteModel.id == quote_id).first()
+    def get_quote_by_id(self, quote_id: int, expand_author: bool = False) -> Optional[Quote]:
+        """Get a specific quote by ID, served from the quote cache when possible"""
+        quote = quote_cache.get(quote_id)
+        if quote is None:
+            db_quote = self.db.query(QuoteModel).filter(QuoteModel.id == quote_id).first()
+            
+            if not db_quote:
+                return None
+            
+            quote = self._convert_to_pydantic(db_quote)
+            quote_cache.set(quote_id, quote)
+        
+        if expand_author:
+            return self._with_authors([quote])[0]
+        return quote
+    
+    def get_quotes_by_ids(self, quote_ids: List[int], expand_author: bool = False) -> List[Quote]:
+        """
+        Get quotes by id in the order given, skipping ids that do not exist.
+        Cached quotes are served from the quote cache and the rest are read with one IN query;
+        authors, when expanded, take at most one more.
+        """
+        found = {}
+        misses = []
+        for quote_id in quote_ids:
+            quote = quote_cache.get(quote_id)
+            if quote is not None:
+                found[quote_id] = quote
+            else:
+                misses.append(quote_id)
+        
+        if misses:
+            for db_quote in self.db.scalars(select(QuoteModel).where(QuoteModel.id.in_(misses))):
+                quote = self._convert_to_pydantic(db_quote)
+                quote_cache.set(db_quote.id, quote)
+                found[db_quote.id] = quote
+        
+        quotes = [found[quote_id] for quote_id in quote_ids if quote_id in found]
+        if expand_author:
+            return self._with_authors(quotes)
+        return quotes
+    
+    def random_quote(self, category: Optional[str] = None, author: Optional[int] = None) -> Optional[Quote]:
+        """
+        A uniformly random quote matching the filters, or None when nothing matches.
+        Picks come from the in-memory id index and are fetched through the quote cache; picks
+        that were deleted or moved since the list loaded are skipped, and a list that keeps
+        missing is reloaded once.
+        """
+        if category and author:
+            # Too narrow to be worth an index list of its own
+            ids = self.db.scalars(select(QuoteModel.id).where(*self._filters(category, author))).all()
+            return self.get_quote_by_id(random.choice(ids)) if ids else None
+        
+        if category:
+            key = ("category", category)
+        elif author:
+            key = ("author", author)
+        else:
+            key = ("all",)
+        
+        def load():
+            return self.db.scalars(
+                select(QuoteModel.id).where(*self._filters(category, author)).order_by(QuoteModel.id)
+            )
+        
+        for attempt in range(2):
+            for _ in range(RANDOM_PICK_ATTEMPTS):
+                quote_id = quote_ids.pick(key, load)
+                if quote_id is None:
+                    return None
+                quote = self.get_quote_by_id(quote_id)
+                if quote is not None and (not category or quote.category == category) \
+                        and (not author or quote.author == author):
+                    return quote
+            quote_ids.invalidate(key)
+        
+        return None
+    
+    def get_daily_quote(self, day: date) -> Optional[Quote]:
+        """
+        The quote of the day. The first request of a UTC day makes a pick seeded by the date and
+        records it in daily_quotes; every process then serves the recorded pick, which is only
+        replaced if that quote is deleted.
+        """
+        recorded = self.db.scalar(select(DailyQuoteModel.quote_id).where(DailyQuoteModel.day == day))
+        if recorded is not None:
+            quote = self.get_quote_by_id(recorded)
+            if quote is not None:
+                return quote
         
-        if not db_quote:
+        low, high = self.db.execute(select(func.min(QuoteModel.id), func.max(QuoteModel.id))).one()
+        if low is None:
             return None
         
-        # Update fields if provided
-        if quote_update.text is not None:
-            db_quote.text = quote_update.text
-        if quote_update.category is not None:
-            db_quote.category = quote_update.category
-        if quote_update.author is not None:
-            # Verify user exists
-            user = self.db.query(UserModel).filter(UserModel.id == quote_update.author).first()
-            if not user:
-                raise ValueError(f"User with id {quote_update.author} not found")
-            db_quote.author = quote_update.author
-        
-        # Commit changes
+        seed = int.from_bytes(hashlib.sha256(day.isoformat().encode()).digest()[:8], "big")
+        target = low + seed % (high - low + 1)
+        # Ids can have gaps, so take the first existing id at or after the target
+        quote_id = self.db.scalar(
+            select(QuoteModel.id).where(QuoteModel.id >= target).order_by(QuoteModel.id).limit(1)
+        )
+        
+        # Another process may record its pick first; whichever lands first is served by all
+        if recorded is None:
+            self.db.execute(insert(DailyQuoteModel).prefix_with("OR IGNORE").values(day=day, quote_id=quote_id))
+        else:
+            self.db.execute(
+                update(DailyQuoteModel)
+                .where(DailyQuoteModel.day == day, DailyQuoteModel.quote_id == recorded)
+                .values(quote_id=quote_id)
+            )
         self.db.commit()
-        self.db.refresh(db_quote)
+        
+        recorded = self.db.scalar(select(DailyQuoteModel.quote_id).where(DailyQuoteModel.day == day))
+        return self.get_quote_by_id(recorded)
+    
+    def update_quote(self, quote_id: int, quote_update: QuoteUpdate) -> Optional[Quote]:
+        """Update a specific quote with one UPDATE ... RETURNING"""
+        values = self._update_values(quote_update)
+        if not values:
+            return self.get_quote_by_id(quote_id)
+        
+        try:
+            db_quote = self.db.scalars(
+                update(QuoteModel)
+                .where(QuoteModel.id == quote_id)
+                .values(**values)
+                .returning(QuoteModel)
+            ).one_or_none()
+            self.db.commit()
+        except IntegrityError as e:
+            self._raise_for_author(e, quote_update.author)
+        
+        if db_quote is None:
+            return None
+        quote_cache.invalidate(quote_id)
+        # RETURNING only sees the new row, so lists the quote may have joined are reloaded;
+        # lists it left skip the id on their next pick
+        if "category" in values:
+            quote_ids.invalidate(("category", db_quote.category))
+        if "author" in values:
+            quote_ids.invalidate(("author", db_quote.author))
         
         return self._convert_to_pydantic(db_quote)
     
     def delete_quote(self, quote_id: int) -> Optional[Quote]:
-        """Delete a specific quote"""
-        db_quote = self.db.query(QuoteModel).filter(QuoteModel.id == quote_id).first()
+        """Delete a specific quote with one DELETE ... RETURNING"""
+        db_quote = self.db.scalars(
+            delete(QuoteModel).where(QuoteModel.id == quote_id).returning(QuoteModel)
+        ).one_or_none()
+        self.db.commit()
         
-        if not db_quote:
+        if db_quote is None:
             return None
+        quote_cache.invalidate(quote_id)
+        quote_ids.remove(quote_id, db_quote.category, db_quote.author)
+        
+        return self._convert_to_pydantic(db_quote)
+    
+    def update_quotes(
+        self,
+        quote_filter: QuoteFilter,
+        quote_update: QuoteUpdate,
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> int:
+        """
+        Apply the same update to every quote matching the filter with set-based
+        UPDATE ... RETURNING statements, one per chunk of ids and each in its own transaction so
+        the write lock is held briefly. Returns the number of quotes updated.
+        """
+        values = self._update_values(quote_update)
+        if not values:
+            return 0
         
-        # Convert to Pydantic model before deletion
-        quote = self._convert_to_pydantic(db_quote)
+        def update_chunk(chunk):
+            return update(QuoteModel).where(QuoteModel.id.in_(chunk)).values(**values)
         
-        # Delete from database
-        self.db.delete(db_quote)
-        self.db.commit()
+        try:
+            updated = self._in_chunks(quote_filter, chunk_size, update_chunk)
+        except IntegrityError as e:
+            self._raise_for_author(e, quote_update.author)
         
-        return quote
+        # Lists the quotes may have joined are reloaded; lists they left skip them on pick
+        if updated and "category" in values:
+            quote_ids.invalidate(("category", quote_update.category))
+        if updated and "author" in values:
+            quote_ids.invalidate(("author", quote_update.author))
+        
+        return len(updated)
+    
+    def delete_quotes(
+        self,
+        quote_filter: QuoteFilter,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        max_chunks: Optional[int] = None
+    ) -> int:
+        """
+        Delete every quote matching the filter with set-based DELETE ... RETURNING statements,
+        one per chunk of ids and each in its own transaction; with max_chunks, stop after that
+        many chunks. Returns the number of quotes deleted.
+        """
+        deleted = self._in_chunks(
+            quote_filter,
+            chunk_size,
+            lambda chunk: delete(QuoteModel).where(QuoteModel.id.in_(chunk)),
+            max_chunks
+        )
+        for row in deleted:
+            quote_ids.remove(row.id, row.category, row.author)
+        
+        return len(deleted)
+    
+    def _in_chunks(
+        self,
+        quote_filter: QuoteFilter,
+        chunk_size: int,
+        statement,
+        max_chunks: Optional[int] = None
+    ) -> list:
+        """
+        Run statement(chunk) until no matching quote is left (or max_chunks times), where chunk
+        selects the next chunk_size matching ids in id order, committing after every chunk.
+        Returns the (id, category, author) rows the statements touched; their cache entries are
+        dropped.
+        """
+        criteria = self._matching(quote_filter)
+        rows = []
+        last_id = 0
+        chunks = 0
+        while True:
+            chunk = (
+                select(QuoteModel.id)
+                .where(*criteria, QuoteModel.id > last_id)
+                .order_by(QuoteModel.id)
+                .limit(chunk_size)
+                .scalar_subquery()
+            )
+            touched = self.db.execute(
+                statement(chunk)
+                .returning(QuoteModel.id, QuoteModel.category, QuoteModel.author)
+                .execution_options(synchronize_session=False)
+            ).all()
+            self.db.commit()
+            for row in touched:
+                quote_cache.invalidate(row.id)
+            rows.extend(touched)
+            chunks += 1
+            if len(touched) < chunk_size or chunks == max_chunks:
+                return rows
+            last_id = max(row.id for row in touched)
+    
+    def _raise_for_author(self, error: IntegrityError, author: Optional[int]) -> None:
+        """Roll back a failed write, reporting a rejected author the way the API always has"""
+        self.db.rollback()
+        if author is not None and "FOREIGN KEY constraint failed" in str(error.orig):
+            raise ValueError(f"User with id {author} not found") from None
+        raise error
+    
+    @staticmethod
+    def _matching(quote_filter: QuoteFilter) -> list:
+        """Build the WHERE criteria of a filter-based bulk update or delete"""
+        criteria = QuoteService._filters(quote_filter.category, quote_filter.author)
+        
+        if quote_filter.ids is not None:
+            criteria.append(QuoteModel.id.in_(quote_filter.ids))
+        
+        # created_at is stored as UTC text, so bounds are compared in the same rendering
+        created_at = type_coerce(QuoteModel.created_at, String)
+        if quote_filter.created_after is not None:
+            criteria.append(created_at >= sqlite_timestamp(quote_filter.created_after))
+        if quote_filter.created_before is not None:
+            criteria.append(created_at < sqlite_timestamp(quote_filter.created_before))
+        
+        return criteria
+    
+    @staticmethod
+    def _update_values(quote_update: QuoteUpdate) -> dict:
+        """Column values for the fields an update provides"""
+        return {
+            name: value
+            for name, value in (
+                ("text", quote_update.text),
+                ("category", quote_update.category),
+                ("author", quote_update.author),
+            )
+            if value is not None
+        }
     
-    def _convert_to_pydantic(self, db_quote: QuoteModel) -> Quote:
+    @staticmethod
+    def _filters(category: Optional[str] = None, author: Optional[int] = None) -> list:
+        """Build the WHERE criteria shared by the list and export queries"""
+        criteria = []
+        
+        if category:
+            criteria.append(QuoteModel.category == category)
+        
+        if author:
+            criteria.append(QuoteModel.author == author)
+        
+        return criteria
+    
+    def _with_authors(self, quotes: List[Quote]) -> List[Quote]:
+        """
+        Copies of the quotes with author_details filled in, fetching their authors in one batch.
+        Cached quotes are shared, so they are copied rather than modified.
+        """
+        authors = {
+            user.id: user
+            for user in UserService(self.db).get_users_by_ids(list(dict.fromkeys(q.author for q in quotes)))
+        }
+        return [
+            trusted_construct(Quote, {**quote.__dict__, "author_details": authors.get(quote.author)})
+            for quote in quotes
+        ]
+    
+    @staticmethod
+    def _fts_query(q: str) -> str:
+        """Turn free text into an FTS5 query that matches all of its words"""
+        words = re.findall(r"\w+", q)
+        if not words:
+            raise ValueError("Search query must contain at least one word")
+        return " ".join(f'"{word}"' for word in words)
+    
+    @staticmethod
+    def _convert_to_pydantic(db_quote: QuoteModel, author_details: Optional[User] = None) -> Quote:
         """Convert SQLAlchemy model to Pydantic model"""
-        return Quote(
-            id=db_quote.id,
-            text=db_quote.text,
-            category=db_quote.category,
-            author=db_quote.author,
-            created_at=db_quote.created_at,
-            updated_at=db_quote.updated_at
+        return trusted_construct(Quote, {
+            "text": db_quote.text,
+            "category": db_quote.category,
+            "author": db_quote.author,
+            "id": db_quote.id,
+            "created_at": db_quote.created_at,
+            "updated_at": db_quote.updated_at,
+            "author_details": author_details
+        })
+
+
+class AsyncQuoteService:
+    """
+    Async variant of QuoteService for use with an AsyncSession.
+    Each call runs the QuoteService logic through run_sync, so queries go over the
+    aiosqlite driver without blocking the event loop.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_quote(self, quote_data: QuoteCreate) -> Quote:
+        """Create a new quote"""
+        return await self.db.run_sync(lambda db: QuoteService(db).create_quote(quote_data))
+    
+    async def create_quotes(self, quotes: List[QuoteCreate]) -> List[Union[Quote, ValueError]]:
+        """Create several quotes in one transaction"""
+        return await self.db.run_sync(lambda db: QuoteService(db).create_quotes(quotes))
+    
+    async def bulk_create_quotes(self, rows: List[tuple[int, QuoteCreate]]) -> tuple[int, List[tuple[int, str]]]:
+        """Insert a chunk of quotes in one transaction"""
+        return await self.db.run_sync(lambda db: QuoteService(db).bulk_create_quotes(rows))
+    
+    async def get_quotes(
+        self, 
+        page: int = 1, 
+        per_page: int = 10, 
+        category: Optional[str] = None, 
+        author: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
+        expand_author: bool = False
+    ) -> tuple[List[Quote], Optional[int], Optional[str]]:
+        """Get quotes with pagination and filtering"""
+        return await self.db.run_sync(
+            lambda db: QuoteService(db).get_quotes(
+                page, per_page, category, author, cursor, include_total, estimate_total, expand_author
+            )
+        )
+    
+    async def get_quotes_version(self) -> int:
+        """Number of writes ever made to quotes"""
+        return await self.db.run_sync(lambda db: QuoteService(db).get_quotes_version())
+    
+    async def search_quotes(
+        self,
+        q: str,
+        per_page: int = 10,
+        cursor: Optional[str] = None
+    ) -> tuple[List[QuoteSearchResult], Optional[str]]:
+        """Full-text search over quote text"""
+        return await self.db.run_sync(lambda db: QuoteService(db).search_quotes(q, per_page, cursor))
+    
+    async def stream_quotes(
+        self,
+        category: Optional[str] = None,
+        author: Optional[int] = None,
+        yield_per: int = 1000
+    ) -> AsyncIterator[List[Quote]]:
+        """
+        Stream every quote matching the filters in id order, one partition at a time.
+        Rows are read through a server-side cursor and the session's identity map only holds
+        them weakly, so the full result is never held in memory.
+        """
+        query = (
+            select(QuoteModel)
+            .where(*QuoteService._filters(category, author))
+            .order_by(QuoteModel.id)
+            .execution_options(yield_per=yield_per)
+        )
+        result = await self.db.stream_scalars(query)
+        async for partition in result.partitions():
+            yield [QuoteService._convert_to_pydantic(db_quote) for db_quote in partition]
+    
+    async def get_quote_by_id(self, quote_id: int, expand_author: bool = False) -> Optional[Quote]:
+        """Get a specific quote by ID"""
+        return await self.db.run_sync(lambda db: QuoteService(db).get_quote_by_id(quote_id, expand_author))
+    
+    async def get_quotes_by_ids(self, quote_ids: List[int], expand_author: bool = False) -> List[Quote]:
+        """Get quotes by id with one IN query"""
+        return await self.db.run_sync(lambda db: QuoteService(db).get_quotes_by_ids(quote_ids, expand_author))
+    
+    async def random_quote(self, category: Optional[str] = None, author: Optional[int] = None) -> Optional[Quote]:
+        """A uniformly random quote matching the filters"""
+        return await self.db.run_sync(lambda db: QuoteService(db).random_quote(category, author))
+    
+    async def get_daily_quote(self, day: date) -> Optional[Quote]:
+        """The quote of the day"""
+        return await self.db.run_sync(lambda db: QuoteService(db).get_daily_quote(day))
+    
+    async def update_quote(self, quote_id: int, quote_update: QuoteUpdate) -> Optional[Quote]:
+        """Update a specific quote"""
+        return await self.db.run_sync(lambda db: QuoteService(db).update_quote(quote_id, quote_update))
+    
+    async def delete_quote(self, quote_id: int) -> Optional[Quote]:
+        """Delete a specific quote"""
+        return await self.db.run_sync(lambda db: QuoteService(db).delete_quote(quote_id))
+    
+    async def update_quotes(
+        self,
+        quote_filter: QuoteFilter,
+        quote_update: QuoteUpdate,
+        chunk_size: int = BULK_CHUNK_SIZE
+    ) -> int:
+        """Apply the same update to every quote matching the filter"""
+        return await self.db.run_sync(
+            lambda db: QuoteService(db).update_quotes(quote_filter, quote_update, chunk_size)
+        )
+    
+    async def delete_quotes(
+        self,
+        quote_filter: QuoteFilter,
+        chunk_size: int = BULK_CHUNK_SIZE,
+        max_chunks: Optional[int] = None
+    ) -> int:
+        """Delete every quote matching the filter"""
+        return await self.db.run_sync(
+            lambda db: QuoteService(db).delete_quotes(quote_filter, chunk_size, max_chunks)
         )
@@ -0,0 +1,221 @@
+"""
+Background cascade deletion of users and their quotes.
+Starting a deletion hides the user at once (users.deleted_at) and records a job. A worker task
+then removes the user's quotes in chunks, each in its own short transaction with a pause in
+between so other writers get the write lock, and finally deletes the user row. Progress lives
+in the user_deletions table, so jobs interrupted by a restart resume on the next startup.
+"""
+import asyncio
+import logging
+from typing import Callable, List, Optional
+from sqlalchemy import func, insert, select, update, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.quotes.api.serialization import trusted_construct
+from src.quotes.core.cache import user_cache
+from src.quotes.core.config import USER_DELETE_CHUNK_SIZE, USER_DELETE_PAUSE_MS
+from src.quotes.core.database import AsyncSessionLocal
+from src.quotes.models.database import User as UserModel, UserDeletion as UserDeletionModel
+from src.quotes.services.counters import CounterService
+from src.quotes.services.quotes import QuoteService
+from src.quotes.api.schemas import QuoteFilter, UserDeletion
+
+logger = logging.getLogger("quotes.user_deletions")
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class UserDeletionService:
+    """Service class for cascade deletion jobs"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def start_deletion(self, user_id: int) -> Optional[UserDeletion]:
+        """
+        Hide the user and record a pending deletion job in one transaction.
+        Returns None when the user does not exist or is already being deleted.
+        """
+        hidden = self.db.scalars(
+            update(UserModel)
+            .where(UserModel.id == user_id, UserModel.deleted_at.is_(None))
+            .values(deleted_at=func.now())
+            .returning(UserModel.id)
+        ).one_or_none()
+        if hidden is None:
+            self.db.rollback()
+            return None
+
+        job = self.db.scalars(
+            insert(UserDeletionModel)
+            .values(
+                user_id=user_id,
+                status=PENDING,
+                quotes_total=CounterService(self.db).get("quotes.author", str(user_id)),
+                quotes_deleted=0
+            )
+            .returning(UserDeletionModel)
+        ).one()
+        self.db.commit()
+        user_cache.invalidate(user_id)
+
+        return self._convert_to_pydantic(job)
+
+    def get_deletion(self, deletion_id: int) -> Optional[UserDeletion]:
+        """Get a deletion job by ID"""
+        job = self.db.get(UserDeletionModel, deletion_id)
+        return self._convert_to_pydantic(job) if job else None
+
+    def active_deletion(self, user_id: int) -> Optional[UserDeletion]:
+        """The pending or running deletion job of a user, if any"""
+        job = self.db.scalars(
+            select(UserDeletionModel)
+            .where(UserDeletionModel.user_id == user_id, UserDeletionModel.status.in_((PENDING, RUNNING)))
+            .order_by(UserDeletionModel.id.desc())
+            .limit(1)
+        ).first()
+        return self._convert_to_pydantic(job) if job else None
+
+    def unfinished_deletions(self) -> List[int]:
+        """IDs of jobs that are pending or were interrupted while running"""
+        return list(self.db.scalars(
+            select(UserDeletionModel.id)
+            .where(UserDeletionModel.status.in_((PENDING, RUNNING)))
+            .order_by(UserDeletionModel.id)
+        ))
+
+    def delete_quotes_chunk(self, deletion_id: int, user_id: int, chunk_size: int) -> int:
+        """Delete the next chunk of the user's quotes and record the progress; returns the chunk's size"""
+        deleted = QuoteService(self.db).delete_quotes(QuoteFilter(author=user_id), chunk_size, max_chunks=1)
+        self._record(
+            deletion_id,
+            status=RUNNING,
+            quotes_deleted=UserDeletionModel.quotes_deleted + deleted
+        )
+        return deleted
+
+    def finish(self, deletion_id: int, user_id: int) -> None:
+        """Delete the user row, now that no quotes reference it, and complete the job"""
+        self.db.execute(delete(UserModel).where(UserModel.id == user_id))
+        self._record(deletion_id, status=COMPLETED, finished_at=func.now())
+        user_cache.invalidate(user_id)
+
+    def fail(self, deletion_id: int, error: str) -> None:
+        """Mark the job failed; the user stays hidden with whatever quotes are left"""
+        self.db.rollback()
+        self._record(deletion_id, status=FAILED, error=error, finished_at=func.now())
+
+    def _record(self, deletion_id: int, **values) -> None:
+        self.db.execute(
+            update(UserDeletionModel)
+            .where(UserDeletionModel.id == deletion_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    @staticmethod
+    def _convert_to_pydantic(job: UserDeletionModel) -> UserDeletion:
+        """Convert SQLAlchemy model to Pydantic model"""
+        return trusted_construct(UserDeletion, {
+            "id": job.id,
+            "user_id": job.user_id,
+            "status": job.status,
+            "quotes_total": job.quotes_total,
+            "quotes_deleted": job.quotes_deleted,
+            "error": job.error,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+            "finished_at": job.finished_at
+        })
+
+
+class AsyncUserDeletionService:
+    """
+    Async variant of UserDeletionService for use with an AsyncSession.
+    Each call runs the UserDeletionService logic through run_sync on the aiosqlite driver.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def start_deletion(self, user_id: int) -> Optional[UserDeletion]:
+        """Hide the user and record a pending deletion job"""
+        return await self.db.run_sync(lambda db: UserDeletionService(db).start_deletion(user_id))
+
+    async def get_deletion(self, deletion_id: int) -> Optional[UserDeletion]:
+        """Get a deletion job by ID"""
+        return await self.db.run_sync(lambda db: UserDeletionService(db).get_deletion(deletion_id))
+
+    async def active_deletion(self, user_id: int) -> Optional[UserDeletion]:
+        """The pending or running deletion job of a user, if any"""
+        return await self.db.run_sync(lambda db: UserDeletionService(db).active_deletion(user_id))
+
+    async def unfinished_deletions(self) -> List[int]:
+        """IDs of jobs that are pending or were interrupted while running"""
+        return await self.db.run_sync(lambda db: UserDeletionService(db).unfinished_deletions())
+
+    async def delete_quotes_chunk(self, deletion_id: int, user_id: int, chunk_size: int) -> int:
+        """Delete the next chunk of the user's quotes"""
+        return await self.db.run_sync(
+            lambda db: UserDeletionService(db).delete_quotes_chunk(deletion_id, user_id, chunk_size)
+        )
+
+    async def finish(self, deletion_id: int, user_id: int) -> None:
+        """Delete the user row and complete the job"""
+        await self.db.run_sync(lambda db: UserDeletionService(db).finish(deletion_id, user_id))
+
+    async def fail(self, deletion_id: int, error: str) -> None:
+        """Mark the job failed"""
+        await self.db.run_sync(lambda db: UserDeletionService(db).fail(deletion_id, error))
+
+
+class UserDeletionWorker:
+    """Runs deletion jobs as tasks on the serving event loop"""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], chunk_size: int, pause: float):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def schedule(self, deletion: UserDeletion) -> None:
+        """Start working through a job in the background"""
+        if deletion.id in self._tasks:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(deletion.id, deletion.user_id))
+        self._tasks[deletion.id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(deletion.id, None))
+
+    async def resume(self) -> None:
+        """Restart the jobs a previous process left unfinished"""
+        async with self.session_factory() as db:
+            service = AsyncUserDeletionService(db)
+            for deletion_id in await service.unfinished_deletions():
+                self.schedule(await service.get_deletion(deletion_id))
+
+    async def close(self) -> None:
+        """Stop the running jobs; their progress is kept and they resume on the next startup"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, deletion_id: int, user_id: int) -> None:
+        async with self.session_factory() as db:
+            service = AsyncUserDeletionService(db)
+            try:
+                while await service.delete_quotes_chunk(deletion_id, user_id, self.chunk_size) == self.chunk_size:
+                    await asyncio.sleep(self.pause)
+                await service.finish(deletion_id, user_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Deleting user %d failed", user_id)
+                await service.fail(deletion_id, str(e))
+
+
+user_deletions = UserDeletionWorker(AsyncSessionLocal, USER_DELETE_CHUNK_SIZE, USER_DELETE_PAUSE_MS / 1000)
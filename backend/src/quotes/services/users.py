@@ -2,11 +2,17 @@
 Service layer for user business logic.
 This layer handles all the business logic and database operations for users.
 """
+import re
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from src.quotes.models.database import User as UserModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select, text
+from sqlalchemy.exc import IntegrityError
+from src.quotes.api.serialization import trusted_construct
+from src.quotes.core.cache import user_cache
+from src.quotes.services.counters import CounterService
+from src.quotes.models.database import User as UserModel, users_fts
 from src.quotes.api.schemas import User, UserCreate, UserUpdate
 
 
@@ -34,21 +40,20 @@ class UserService:
         page: int = 1, 
         per_page: int = 10, 
         name: Optional[str] = None, 
-        email: Optional[str] = None
-    ) -> tuple[List[User], int]:
-        """Get users with pagination and filtering"""
+        email: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[User], Optional[int]]:
+        """
+        Get users with pagination and filtering.
+        The unfiltered total comes from the maintained counters; filtered totals need COUNT(*).
+        """
         
         # Build query with filters
-        query = self.db.query(UserModel)
-        
-        if name:
-            query = query.filter(UserModel.name.ilike(f"%{name}%"))
+        query = self.db.query(UserModel).filter(*self._filters(name, email))
         
-        if email:
-            query = query.filter(UserModel.email.ilike(f"%{email}%"))
-        
-        # Get total count
-        total = query.count()
+        total = None
+        if include_total:
+            total = query.count() if name or email else CounterService(self.db).get("users")
         
         # Apply pagination
         offset = (page - 1) * per_page
@@ -59,17 +64,74 @@ class UserService:
         
         return users, total
     
+    def search_users(self, prefix: str, limit: int = 10) -> List[User]:
+        """
+        Autocomplete users whose name or email local part has words starting with the prefix.
+        Each FTS5 match is joined to its user so users pending deletion are skipped before the
+        limit applies; the scan stops after limit visible matches, so cost does not grow with
+        the table, and the few matches are then ordered by name.
+        """
+        matches = (
+            select(users_fts.c.rowid)
+            .join(UserModel, UserModel.id == users_fts.c.rowid)
+            .where(text("users_fts MATCH :match"), UserModel.deleted_at.is_(None))
+            .limit(limit)
+        )
+        query = (
+            select(UserModel)
+            .where(UserModel.id.in_(matches))
+            .order_by(UserModel.name, UserModel.id)
+        )
+        db_users = self.db.scalars(query, {"match": self._prefix_query(prefix)})
+        return [self._convert_to_pydantic(u) for u in db_users]
+    
+    def get_users_version(self) -> int:
+        """Number of writes ever made to users, used to validate cached list pages"""
+        return CounterService(self.db).get("users.changes")
+    
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        """Get a specific user by ID"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        """Get a specific user by ID, served from the user cache when possible"""
+        user = user_cache.get(user_id)
+        if user is not None:
+            return user
+        
+        db_user = self.db.query(UserModel).filter(
+            UserModel.id == user_id, UserModel.deleted_at.is_(None)
+        ).first()
         
         if not db_user:
             return None
         
-        return self._convert_to_pydantic(db_user)
+        user = self._convert_to_pydantic(db_user)
+        user_cache.set(user_id, user)
+        
+        return user
+    
+    def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """
+        Get users by id in the order given, skipping ids that do not exist.
+        Cached users are served from the user cache and the rest are read with one IN query.
+        """
+        found = {}
+        misses = []
+        for user_id in user_ids:
+            user = user_cache.get(user_id)
+            if user is not None:
+                found[user_id] = user
+            else:
+                misses.append(user_id)
+        
+        if misses:
+            query = select(UserModel).where(UserModel.id.in_(misses), UserModel.deleted_at.is_(None))
+            for db_user in self.db.scalars(query):
+                user = self._convert_to_pydantic(db_user)
+                user_cache.set(db_user.id, user)
+                found[db_user.id] = user
+        
+        return [found[user_id] for user_id in user_ids if user_id in found]
     
     def get_user_by_email(self, email: str) -> Optional[User]:
-        """Get a specific user by email"""
+        """Get a specific user by email, including users pending deletion whose email is still taken"""
         db_user = self.db.query(UserModel).filter(UserModel.email == email).first()
         
         if not db_user:
@@ -79,7 +141,9 @@ class UserService:
     
     def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
         """Update a specific user"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        db_user = self.db.query(UserModel).filter(
+            UserModel.id == user_id, UserModel.deleted_at.is_(None)
+        ).first()
         
         if not db_user:
             return None
@@ -92,13 +156,16 @@ class UserService:
         
         # Commit changes
         self.db.commit()
+        user_cache.invalidate(user_id)
         self.db.refresh(db_user)
         
         return self._convert_to_pydantic(db_user)
     
     def delete_user(self, user_id: int) -> Optional[User]:
-        """Delete a specific user"""
-        db_user = self.db.query(UserModel).filter(UserModel.id == user_id).first()
+        """Delete a specific user; raises ValueError while quotes still reference them"""
+        db_user = self.db.query(UserModel).filter(
+            UserModel.id == user_id, UserModel.deleted_at.is_(None)
+        ).first()
         
         if not db_user:
             return None
@@ -106,18 +173,121 @@ class UserService:
         # Convert to Pydantic model before deletion
         user = self._convert_to_pydantic(db_user)
         
-        # Delete from database
-        self.db.delete(db_user)
-        self.db.commit()
+        # Delete from database; the quotes foreign key refuses users who still have quotes
+        try:
+            self.db.delete(db_user)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise ValueError(f"User with id {user_id} still has quotes")
+        user_cache.invalidate(user_id)
         
         return user
     
-    def _convert_to_pydantic(self, db_user: UserModel) -> User:
+    @staticmethod
+    def _filters(name: Optional[str] = None, email: Optional[str] = None) -> list:
+        """Build the WHERE criteria shared by the list and export queries; users pending deletion are hidden"""
+        criteria = [UserModel.deleted_at.is_(None)]
+        
+        if name:
+            criteria.append(UserModel.name.ilike(f"%{name}%"))
+        
+        if email:
+            criteria.append(UserModel.email.ilike(f"%{email}%"))
+        
+        return criteria
+    
+    @staticmethod
+    def _prefix_query(prefix: str) -> str:
+        """Turn typed text into an FTS5 query that matches every word as a prefix"""
+        words = re.findall(r"\w+", prefix)
+        if not words:
+            raise ValueError("Prefix must contain at least one letter or digit")
+        return " ".join(f'"{word}"*' for word in words)
+    
+    @staticmethod
+    def _convert_to_pydantic(db_user: UserModel) -> User:
         """Convert SQLAlchemy model to Pydantic model"""
-        return User(
-            id=db_user.id,
-            name=db_user.name,
-            email=db_user.email,
-            created_at=db_user.created_at,
-            updated_at=db_user.updated_at
+        return trusted_construct(User, {
+            "name": db_user.name,
+            "email": db_user.email,
+            "id": db_user.id,
+            "created_at": db_user.created_at,
+            "updated_at": db_user.updated_at
+        })
+
+
+class AsyncUserService:
+    """
+    Async variant of UserService for use with an AsyncSession.
+    Each call runs the UserService logic through run_sync on the aiosqlite driver.
+    """
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create_user(self, user_data: UserCreate) -> User:
+        """Create a new user"""
+        return await self.db.run_sync(lambda db: UserService(db).create_user(user_data))
+    
+    async def get_users(
+        self, 
+        page: int = 1, 
+        per_page: int = 10, 
+        name: Optional[str] = None, 
+        email: Optional[str] = None,
+        include_total: bool = True
+    ) -> tuple[List[User], Optional[int]]:
+        """Get users with pagination and filtering"""
+        return await self.db.run_sync(
+            lambda db: UserService(db).get_users(page, per_page, name, email, include_total)
         )
+    
+    async def stream_users(
+        self,
+        name: Optional[str] = None,
+        email: Optional[str] = None,
+        yield_per: int = 1000
+    ) -> AsyncIterator[List[User]]:
+        """
+        Stream every user matching the filters in id order, one partition at a time.
+        Rows are read through a server-side cursor and the session's identity map only holds
+        them weakly, so the full result is never held in memory.
+        """
+        query = (
+            select(UserModel)
+            .where(*UserService._filters(name, email))
+            .order_by(UserModel.id)
+            .execution_options(yield_per=yield_per)
+        )
+        result = await self.db.stream_scalars(query)
+        async for partition in result.partitions():
+            yield [UserService._convert_to_pydantic(db_user) for db_user in partition]
+    
+    async def search_users(self, prefix: str, limit: int = 10) -> List[User]:
+        """Autocomplete users by name or email prefix"""
+        return await self.db.run_sync(lambda db: UserService(db).search_users(prefix, limit))
+    
+    async def get_users_version(self) -> int:
+        """Number of writes ever made to users"""
+        return await self.db.run_sync(lambda db: UserService(db).get_users_version())
+    
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        """Get a specific user by ID"""
+        return await self.db.run_sync(lambda db: UserService(db).get_user_by_id(user_id))
+    
+    async def get_users_by_ids(self, user_ids: List[int]) -> List[User]:
+        """Get users by id with one IN query"""
+        return await self.db.run_sync(lambda db: UserService(db).get_users_by_ids(user_ids))
+    
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get a specific user by email"""
+        return await self.db.run_sync(lambda db: UserService(db).get_user_by_email(email))
+    
+    async def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+        """Update a specific user"""
+        return await self.db.run_sync(lambda db: UserService(db).update_user(user_id, user_update))
+    
+    async def delete_user(self, user_id: int) -> Optional[User]:
+        """Delete a specific user"""
+        return await self.db.run_sync(lambda db: UserService(db).delete_user(user_id))
@@ -0,0 +1,50 @@
+"""
+Shared fixtures. The app reads its settings at import time, so the database is pointed at a
+fresh temporary file before main is imported; every test module shares that database.
+"""
+import os
+import sqlite3
+import tempfile
+import uuid
+
+os.environ["QUOTES_DATABASE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="quotes-tests-"), "quotes.db")
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src.quotes.core.config import DATABASE_PATH
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def user(client):
+    """A fresh user, as returned by the API"""
+    email = f"{uuid.uuid4().hex}@example.com"
+    response = client.post("/users/", json={"name": "Test User", "email": email})
+    assert response.status_code == 201, response.text
+    return response.json()["data"]
+
+
+@pytest.fixture
+def category():
+    """A category no other test uses, to keep list results to the test's own quotes"""
+    return f"test-{uuid.uuid4().hex[:12]}"
+
+
+def execute_raw(sql: str, *params) -> int:
+    """
+    Run one statement on a plain connection that bypasses the services and does not enforce
+    foreign keys, to set up rows the API would refuse; returns the last inserted rowid.
+    """
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        with conn:
+            return conn.execute(sql, params).lastrowid
+    finally:
+        conn.close()
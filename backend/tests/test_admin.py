@@ -0,0 +1,86 @@
+"""Quote admin list page"""
+import asyncio
+import sqlite3
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import FastAPI
+from starlette.requests import Request
+
+from src.quotes.admin import admin as admin_module
+from src.quotes.admin.admin import QuoteAdmin, setup_admin
+from src.quotes.core.config import DATABASE_PATH
+from tests.conftest import execute_raw
+
+
+@pytest.fixture(scope="module")
+def view(client):
+    admin = setup_admin(FastAPI())
+    return next(v for v in admin.views if isinstance(v, QuoteAdmin))
+
+
+def list_page(view, **params):
+    request = Request({"type": "http", "method": "GET", "path": "/admin/quote/list", "headers": [],
+                       "query_string": urlencode(params).encode()})
+    return asyncio.run(view.list(request))
+
+
+def insert_quotes(user, category, created_at: list) -> list[int]:
+    return [
+        execute_raw(
+            "INSERT INTO quotes (text, category, author, created_at) VALUES (?, ?, ?, ?)",
+            "x", category, user["id"], value
+        )
+        for value in created_at
+    ]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_list_pages_through_equal_and_null_sort_values(view, user, category, descending):
+    # Quote.id breaks ties between equal dates; quotes without created_at sort first ascending
+    dated = insert_quotes(user, category, [f"2024-01-0{1 + i % 3} 00:00:00" for i in range(7)])
+    undated = insert_quotes(user, category, [None] * 4)
+    dated_order = sorted(dated, key=lambda quote_id: ((quote_id - dated[0]) % 3, quote_id))
+    expected = sorted(undated) + dated_order
+    if descending:
+        expected.reverse()
+
+    params = {"search": category, "sortBy": "created_at", "sort": "desc" if descending else "asc", "pageSize": 3}
+    seen = []
+    for page in range(1, 5):
+        pagination = list_page(view, page=page, **params)
+        assert pagination.count == len(expected)
+        seen += [row.id for row in pagination.rows]
+
+    assert seen == expected
+
+
+def test_list_search_and_default_order(view, user, category):
+    ids = insert_quotes(user, category, [None] * 3)
+
+    pagination = list_page(view, search=category)
+
+    assert pagination.count == 3
+    assert [row.id for row in pagination.rows] == sorted(ids, reverse=True)
+
+
+def test_unfiltered_count_reads_the_counter(view, user, category):
+    insert_quotes(user, category, [None] * 2)
+    conn = sqlite3.connect(DATABASE_PATH)
+    try:
+        total = conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+    finally:
+        conn.close()
+
+    assert list_page(view).count == total
+
+
+def test_filtered_count_stops_at_the_limit(view, user, category, monkeypatch):
+    monkeypatch.setattr(admin_module, "SEARCH_COUNT_LIMIT", 4)
+    insert_quotes(user, category, [None] * 6)
+
+    pagination = list_page(view, search=category, pageSize=2, page=2)
+
+    assert pagination.count == 4
+    assert len(pagination.rows) == 2
+
@@ -0,0 +1,38 @@
+"""Cache invalidation for writes made by other processes"""
+import time
+
+from src.quotes.core.cache import quote_cache, user_cache
+from src.quotes.core.config import CACHE_SYNC_MS
+from tests.conftest import execute_raw
+
+
+def wait_for(read, expected, timeout: float):
+    deadline = time.monotonic() + timeout
+    while True:
+        value = read()
+        if value == expected or time.monotonic() > deadline:
+            return value
+        time.sleep(0.02)
+
+
+def test_quote_written_elsewhere_is_invalidated(client, user, category):
+    response = client.post("/quotes/", json={"text": "Before", "author": user["id"], "category": category})
+    quote_id = response.json()["data"]["id"]
+    client.get(f"/quotes/{quote_id}")
+    assert quote_cache.get(quote_id) is not None
+
+    # A plain connection stands in for another worker: only the change log tells this one
+    execute_raw("UPDATE quotes SET text = 'After' WHERE id = ?", quote_id)
+
+    text = wait_for(lambda: client.get(f"/quotes/{quote_id}").json()["data"]["text"], "After", 10 * CACHE_SYNC_MS / 1000)
+    assert text == "After"
+
+
+def test_user_written_elsewhere_is_invalidated(client, user):
+    client.get(f"/users/{user['id']}")
+    assert user_cache.get(user["id"]) is not None
+
+    execute_raw("UPDATE users SET name = 'Renamed' WHERE id = ?", user["id"])
+
+    name = wait_for(lambda: client.get(f"/users/{user['id']}").json()["data"]["name"], "Renamed", 10 * CACHE_SYNC_MS / 1000)
+    assert name == "Renamed"
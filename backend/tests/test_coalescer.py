@@ -0,0 +1,90 @@
+"""Group commit of concurrent quote creates"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.quotes.api.schemas import QuoteCreate
+from src.quotes.core.database import ASYNC_SQLALCHEMY_DATABASE_URL, WriterSession, create_async_db_engine, profile
+from src.quotes.services.coalescer import QuoteWriteCoalescer
+
+
+def run(test, window: float = 0.05, max_batch: int = 100):
+    """Run test(coalescer, sessions) on an engine of its own; sessions counts the transactions opened"""
+    async def main():
+        engine = create_async_db_engine(ASYNC_SQLALCHEMY_DATABASE_URL, profile)
+        factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, sync_session_class=WriterSession, expire_on_commit=False
+        )
+        sessions = []
+
+        def session_factory():
+            sessions.append(1)
+            return factory()
+
+        coalescer = QuoteWriteCoalescer(session_factory, window, max_batch)
+        try:
+            return await test(coalescer, sessions)
+        finally:
+            await coalescer.close()
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def quote(author: int, category: str, text: str = "A quote") -> QuoteCreate:
+    return QuoteCreate(text=text, author=author, category=category)
+
+
+def test_creates_within_the_window_share_a_transaction(user, category):
+    async def test(coalescer, sessions):
+        created = await asyncio.gather(*(coalescer.create_quote(quote(user["id"], category, f"Q{i}")) for i in range(6)))
+        return created, len(sessions)
+
+    created, transactions = run(test)
+
+    assert [q.text for q in created] == [f"Q{i}" for i in range(6)]
+    assert len({q.id for q in created}) == 6
+    assert transactions == 1
+
+
+def test_batches_are_cut_at_max_batch(user, category):
+    async def test(coalescer, sessions):
+        await asyncio.gather(*(coalescer.create_quote(quote(user["id"], category)) for _ in range(5)))
+        return len(sessions)
+
+    assert run(test, max_batch=2) == 3
+
+
+def test_a_rejected_row_does_not_fail_the_others(user, category):
+    async def test(coalescer, sessions):
+        authors = [user["id"]] * 5 + [999999999]
+        return await asyncio.gather(
+            *(coalescer.create_quote(quote(author, category)) for author in authors), return_exceptions=True
+        )
+
+    results = run(test)
+
+    assert sum(not isinstance(result, Exception) for result in results) == 5
+    assert isinstance(results[-1], ValueError)
+
+
+def test_a_row_breaking_the_transaction_is_isolated(user, category):
+    async def test(coalescer, sessions):
+        broken = QuoteCreate.model_construct(text=None, author=user["id"], category=category)
+        rows = [quote(user["id"], category), broken, quote(user["id"], category)]
+        return await asyncio.gather(*(coalescer.create_quote(row) for row in rows), return_exceptions=True)
+
+    first, broken, last = run(test)
+
+    assert first.id and last.id
+    assert isinstance(broken, Exception)
+
+
+def test_close_writes_out_queued_creates(user, category):
+    async def test(coalescer, sessions):
+        pending = [asyncio.ensure_future(coalescer.create_quote(quote(user["id"], category))) for _ in range(3)]
+        await asyncio.sleep(0)
+        await coalescer.close()
+        return [task.result() for task in pending if task.done()]
+
+    assert len(run(test, window=0.5)) == 3
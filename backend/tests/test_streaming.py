@@ -0,0 +1,83 @@
+"""Incremental parsing of streamed bulk bodies"""
+import asyncio
+import json
+
+import pytest
+
+from src.quotes.api import streaming
+from src.quotes.api.streaming import iter_json_records
+
+
+class Body:
+    """A request body delivered in the given chunks, counting how many were read"""
+
+    def __init__(self, chunks):
+        self.chunks = [chunk.encode() if isinstance(chunk, str) else chunk for chunk in chunks]
+        self.read = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+
+def parse(body: Body) -> list:
+    async def collect():
+        return [item async for item in iter_json_records(body)]
+    return asyncio.run(collect())
+
+
+def test_array_split_at_every_byte():
+    records = [
+        {"text": "café \"quoted\" \\ ☃", "category": None, "author": 1},
+        {"n": -12.5e3, "flags": [True, False, None], "nested": {"deep": [1, {"x": "y"}]}},
+        {"big": float("-inf"), "nan": float("nan")},
+    ]
+    raw = json.dumps(records).encode()
+
+    parsed = parse(Body([raw[i:i + 1] for i in range(len(raw))]))
+
+    assert [index for index, _, _ in parsed] == [0, 1, 2]
+    assert parsed[0][1] == records[0]
+    assert parsed[1][1] == records[1]
+    assert parsed[2][1]["big"] == float("-inf")
+
+
+def test_malformed_array_element_fails_without_reading_the_rest():
+    good = json.dumps({"text": "fine", "author": 1})
+    body = Body(["[" + good + ", {\"text\": oops}, "] + [good + ", "] * 1000 + [good + "]"])
+
+    with pytest.raises(ValueError, match="element 1"):
+        parse(body)
+
+    assert body.read <= 3
+
+
+def test_oversized_array_element_is_rejected(monkeypatch):
+    monkeypatch.setattr(streaming, "MAX_RECORD_CHARS", 100)
+    body = Body(['[{"text": "'] + ["x" * 50] * 1000 + ['"}]'])
+
+    with pytest.raises(ValueError, match="exceeds 100 characters"):
+        parse(body)
+
+    assert body.read <= 4
+
+
+def test_oversized_ndjson_line_is_reported_and_skipped(monkeypatch):
+    monkeypatch.setattr(streaming, "MAX_RECORD_CHARS", 100)
+    body = Body(['{"a": 1}\n{"text": "'] + ["x" * 50] * 10 + ['"}\n{"b": 2}\n'])
+
+    parsed = parse(body)
+
+    assert parsed[0] == (0, {"a": 1}, None)
+    assert parsed[1][0] == 1 and parsed[1][2] == "Line exceeds 100 characters"
+    assert parsed[2] == (2, {"b": 2}, None)
+
+
+def test_bulk_route_rejects_malformed_array(client, user):
+    body = json.dumps([{"text": "ok", "author": user["id"]}])[:-1] + ', {"text": nope}]'
+
+    response = client.post("/quotes/bulk", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 400
+    assert "element 1" in response.json()["detail"]
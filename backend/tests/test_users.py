@@ -0,0 +1,122 @@
+"""User routes"""
+import time
+import uuid
+
+from src.quotes.core import database
+from src.quotes.core.database import SessionLocal
+from src.quotes.services.user_deletions import UserDeletionService
+
+
+def wait_for_deletion(client, location: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        deletion = client.get(location).json()["data"]
+        if deletion["status"] in ("completed", "failed") or time.monotonic() > deadline:
+            return deletion
+        time.sleep(0.05)
+
+
+def test_delete_user_without_quotes_deletes_at_once(client, user):
+    response = client.delete(f"/users/{user['id']}")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["id"] == user["id"]
+    assert client.get(f"/users/{user['id']}").status_code == 404
+
+
+def test_delete_user_with_quotes_cascades_in_the_background(client, user, category):
+    quote_ids = [
+        client.post("/quotes/", json={"text": f"Quote {i}", "author": user["id"], "category": category}).json()["data"]["id"]
+        for i in range(3)
+    ]
+
+    response = client.delete(f"/users/{user['id']}")
+
+    assert response.status_code == 202, response.text
+    assert response.json()["data"]["user_id"] == user["id"]
+    assert response.json()["data"]["quotes_total"] == 3
+    # Hidden as soon as the deletion starts
+    assert client.get(f"/users/{user['id']}").status_code == 404
+
+    deletion = wait_for_deletion(client, response.headers["Location"])
+    assert deletion["status"] == "completed"
+    assert deletion["quotes_deleted"] == 3
+    assert all(client.get(f"/quotes/{quote_id}").status_code == 404 for quote_id in quote_ids)
+
+
+def test_delete_user_returns_the_running_deletion(client, user, category):
+    client.post("/quotes/", json={"text": "A quote", "author": user["id"], "category": category})
+    # Started without scheduling the worker, so the job stays pending
+    with SessionLocal() as db:
+        started = UserDeletionService(db).start_deletion(user["id"])
+
+    response = client.delete(f"/users/{user['id']}")
+
+    assert response.status_code == 202, response.text
+    assert response.json()["data"]["id"] == started.id
+    assert response.headers["Location"] == f"/users/deletions/{started.id}"
+
+
+def test_delete_unknown_user(client):
+    assert client.delete("/users/999999999").status_code == 404
+
+
+def test_search_matches_word_prefixes_of_name_and_email(client):
+    tag = uuid.uuid4().hex[:8]
+    ada = client.post("/users/", json={"name": f"Ada Lovelace{tag}", "email": f"countess{tag}@example.com"}).json()["data"]
+    alan = client.post("/users/", json={"name": f"Alan Turing{tag}", "email": f"alan{tag}@example.com"}).json()["data"]
+
+    def search(prefix):
+        response = client.get("/users/search", params={"prefix": prefix})
+        assert response.status_code == 200, response.text
+        return [u["id"] for u in response.json()["data"]]
+
+    assert search(f"LOVELACE{tag[:4]}") == [ada["id"]]
+    assert search(f"countess{tag}") == [ada["id"]]
+    assert search(tag) == []
+    assert search(f"ada lovelace{tag}") == [ada["id"]]
+    client.put(f"/users/{alan['id']}", json={"name": f"Alan Lovelace{tag}"})
+    assert search(f"lovelace{tag}") == [ada["id"], alan["id"]]
+    assert client.get("/users/search", params={"prefix": "@!"}).status_code == 400
+
+
+def test_search_skips_users_pending_deletion_before_the_limit(client, category):
+    prefix = f"zed{uuid.uuid4().hex[:8]}"
+    users = [
+        client.post("/users/", json={"name": f"{prefix} {i}", "email": f"{prefix}{i}@example.com"}).json()["data"]
+        for i in range(5)
+    ]
+    # Hide the first three with pending deletions that are never worked through
+    for hidden in users[:3]:
+        client.post("/quotes/", json={"text": "A quote", "author": hidden["id"], "category": category})
+        with SessionLocal() as db:
+            UserDeletionService(db).start_deletion(hidden["id"])
+
+    response = client.get("/users/search", params={"prefix": prefix, "limit": 3})
+
+    assert response.status_code == 200, response.text
+    assert [u["id"] for u in response.json()["data"]] == [u["id"] for u in users[3:]]
+
+
+def test_reads_follow_the_client_that_wrote_to_the_writer(client, monkeypatch):
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 5.0)
+    used = []
+    for name in ("AsyncSessionLocal", "AsyncReadSessionLocal"):
+        factory = getattr(database, name)
+        monkeypatch.setattr(database, name, lambda factory=factory, name=name: used.append(name) or factory())
+
+    try:
+        created = client.post("/users/", json={"name": "Writer", "email": f"{uuid.uuid4().hex}@example.com"})
+        assert database.READ_YOUR_WRITES_COOKIE in created.headers["set-cookie"]
+        used.clear()
+        client.get(f"/users/{created.json()['data']['id']}")
+        assert "AsyncSessionLocal" in used
+
+        # Another client, without the cookie, still reads from the read-only pool
+        client.cookies.clear()
+        used.clear()
+        client.get(f"/users/{created.json()['data']['id']}")
+        # Background readers such as the cache sync may open read sessions meanwhile
+        assert "AsyncReadSessionLocal" in used and "AsyncSessionLocal" not in used
+    finally:
+        client.cookies.clear()
@@ -1,4 +1,4 @@
-import type { Quote, QuoteCreate, User, UserCreate, ApiResponse, ApiListResponse } from '../types';
+import type { Quote, QuoteCreate, User, UserCreate, UserDeletion, ApiResponse, ApiListResponse } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -93,8 +93,9 @@ class ApiClient {
     });
   }
 
-  async deleteUser(id: number): Promise<ApiResponse<User>> {
-    return this.request<ApiResponse<User>>(`/users/${id}`, {
+  // Resolves with the deleted user, or with a deletion job (202) when their quotes are removed in the background
+  async deleteUser(id: number): Promise<ApiResponse<User | UserDeletion>> {
+    return this.request<ApiResponse<User | UserDeletion>>(`/users/${id}`, {
       method: 'DELETE',
     });
   }
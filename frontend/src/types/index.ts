@@ -6,6 +6,18 @@ export interface User {
   updated_at: string;
 }
 
+export interface UserDeletion {
+  id: number;
+  user_id: number;
+  status: 'pending' | 'running' | 'completed' | 'failed';
+  quotes_total: number;
+  quotes_deleted: number;
+  error?: string;
+  created_at: string;
+  updated_at: string;
+  finished_at?: string;
+}
+
 export interface Quote {
   id: number;
   text: string;